@@ -71,9 +71,13 @@ docs_to_remove = [
     "cleanup_docs.py"
 ]
 
+# List the project directory once instead of stat-ing every name
+with os.scandir(project_dir) as entries:
+    present = {entry.name: entry for entry in entries}
+
 print("📋 ESSENTIAL DOCUMENTATION (keeping):")
 for doc in sorted(essential_docs):
-    if (project_dir / doc).exists():
+    if doc in present:
         print(f"✅ Keep: {doc}")
 
 print(f"\n🗑️  REMOVING DEVELOPMENT ARTIFACTS:")
@@ -82,10 +86,10 @@ removed_count = 0
 not_found_count = 0
 
 for filename in docs_to_remove:
-    file_path = project_dir / filename
-    if file_path.exists():
+    entry = present.get(filename)
+    if entry is not None:
         try:
-            file_path.unlink()
+            os.unlink(entry.path)
             print(f"✅ Removed: {filename}")
             removed_count += 1
         except Exception as e:
@@ -5,76 +5,176 @@ Handles OneDrive desktop paths and environment setup
 
 import os
 import sys
-import subprocess
-from pathlib import Path
+import json
+import threading
+import importlib
+from functools import lru_cache
 
+# Resolved once; every path below is built from the home directory
+HOME_DIR = os.path.expanduser("~")
+
+# Remembers the desktop folder picked on a previous launch
+DESKTOP_CACHE_FILE = os.path.join(HOME_DIR, ".nsna_cache.json")
+
+def load_cached_desktop_path():
+    """Return the desktop path saved by a previous launch if it is still valid"""
+    try:
+        with open(DESKTOP_CACHE_FILE, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    desktop = cache.get("desktop")
+    if desktop and cache.get("home") == HOME_DIR and os.path.exists(desktop):
+        return desktop
+    return None
+
+def save_cached_desktop_path(desktop_path):
+    """Remember the probed desktop path so later launches can skip the probe"""
+    try:
+        with open(DESKTOP_CACHE_FILE, 'w') as f:
+            json.dump({"home": HOME_DIR, "desktop": desktop_path}, f)
+    except OSError:
+        pass  # Caching is best effort
+
+def is_writable(path):
+    """Check whether new folders can be created inside path"""
+    if os.name != "nt":
+        return os.access(path, os.W_OK)
+    
+    # os.access ignores ACLs on Windows, so probe with a real folder there;
+    # the outcome is cached by find_desktop_path for later launches
+    test_folder = os.path.join(path, "test_write_permission")
+    try:
+        os.makedirs(test_folder, exist_ok=True)
+        os.rmdir(test_folder)
+        return True
+    except OSError:
+        return False
+
+def desktop_candidates():
+    """Yield existing desktop folders, the standard Desktop before OneDrive ones"""
+    # One directory listing of home replaces an exists() probe per candidate
+    try:
+        with os.scandir(HOME_DIR) as entries:
+            folders = sorted(entry.name for entry in entries if entry.is_dir())
+    except OSError:
+        return
+    
+    if "Desktop" in folders:
+        yield os.path.join(HOME_DIR, "Desktop")
+    
+    # OneDrive moves the desktop into "OneDrive" or "OneDrive - <Organization>"
+    for name in folders:
+        if name.startswith("OneDrive"):
+            onedrive_desktop = os.path.join(HOME_DIR, name, "Desktop")
+            if os.path.isdir(onedrive_desktop):
+                yield onedrive_desktop
+
+@lru_cache(maxsize=1)
 def find_desktop_path():
     """Find the correct desktop path, handling OneDrive scenarios"""
     
-    # Standard desktop path
-    standard_desktop = Path.home() / "Desktop"
+    # Reuse the result of a previous launch when the folder still exists
+    cached_path = load_cached_desktop_path()
+    if cached_path:
+        return cached_path
     
-    # OneDrive desktop paths
-    onedrive_desktop1 = Path.home() / "OneDrive" / "Desktop"
-    onedrive_desktop2 = Path.home() / "OneDrive - HD Supply, Inc" / "Desktop"
-    
-    # Check which desktop path exists and is writable
-    for desktop_path in [standard_desktop, onedrive_desktop1, onedrive_desktop2]:
-        if desktop_path.exists():
-            try:
-                # Test if we can create a folder
-                test_folder = desktop_path / "test_write_permission"
-                test_folder.mkdir(exist_ok=True)
-                test_folder.rmdir()
-                return desktop_path
-            except:
-                continue
+    # Use the first desktop that is writable
+    for desktop_path in desktop_candidates():
+        if is_writable(desktop_path):
+            save_cached_desktop_path(desktop_path)
+            return desktop_path
     
     # Fallback to Documents if Desktop isn't accessible
-    documents_path = Path.home() / "Documents"
+    documents_path = os.path.join(HOME_DIR, "Documents")
     return documents_path
 
+def prewarm_imports():
+    """Import streamlit's heaviest dependencies in a background thread"""
+    def import_modules():
+        for module in ("pandas", "pandas.io.formats.style", "pyarrow", "altair"):
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                pass
+    
+    # Runs while the folders are being set up; streamlit then finds these
+    # modules already loaded because it is started in this interpreter
+    threading.Thread(target=import_modules, daemon=True).start()
+
+def make_folder(path):
+    """Create a folder with a single mkdir call, ignoring one that already exists"""
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        pass
+
 def setup_environment():
     """Set up the environment and create necessary folders"""
     
-    print("🚀 Starting NSNA Mail Merge Tool Setup")
-    print("=" * 50)
+    prewarm_imports()
+    
+    # Collect the setup report and write it to stdout in one call
+    report = ["🚀 Starting NSNA Mail Merge Tool Setup", "=" * 50]
     
     # Find the best desktop path
     desktop_path = find_desktop_path()
-    print(f"📁 Desktop path: {desktop_path}")
-    
-    # Create NSNA folder structure
-    nsna_folder = desktop_path / "NSNA_Mail_Merge"
-    nsna_folder.mkdir(exist_ok=True)
+    report.append(f"📁 Desktop path: {desktop_path}")
     
-    subfolders = ["templates", "data", "receipts", "exports"]
-    for folder in subfolders:
-        (nsna_folder / folder).mkdir(exist_ok=True)
+    # Create NSNA folder structure, unless a previous launch already did
+    nsna_folder = os.path.join(desktop_path, "NSNA_Mail_Merge")
+    sentinel = os.path.join(nsna_folder, ".nsna_initialized")
+    if os.path.exists(sentinel):
+        report.append(f"✅ Using storage folders at: {nsna_folder}")
+    else:
+        make_folder(nsna_folder)
+        for folder in ("templates", "data", "receipts", "exports"):
+            make_folder(os.path.join(nsna_folder, folder))
+        try:
+            open(sentinel, "w").close()
+        except OSError:
+            pass  # Folders are recreated on the next launch instead
+        report.append(f"✅ Created storage folders at: {nsna_folder}")
     
-    print(f"✅ Created storage folders at: {nsna_folder}")
+    sys.stdout.write("\n".join(report) + "\n")
     
     # Set environment variable for the app
-    os.environ['NSNA_DESKTOP_PATH'] = str(nsna_folder)
+    os.environ['NSNA_DESKTOP_PATH'] = nsna_folder
     
     return nsna_folder
 
+def precompile_app():
+    """Byte-compile the app modules so the first page load skips compiling them"""
+    import compileall
+    
+    # streamlit compiles streamlit_app.py itself on every run, but the modules
+    # it imports from src/ go through the normal import system and .pyc cache.
+    # compile_dir only rewrites files whose .pyc is missing or stale.
+    src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+    compileall.compile_dir(src_dir, quiet=2)
+
 def run_streamlit():
     """Run the Streamlit application"""
     
-    print("\n🌐 Starting Streamlit application...")
-    print("=" * 50)
-    
     try:
-        # Run streamlit
-        cmd = [sys.executable, "-m", "streamlit", "run", "streamlit_app.py", 
-               "--server.port", "8501", "--server.headless", "false"]
+        # Run streamlit in this interpreter rather than spawning
+        # `python -m streamlit run`, which would start Python and import
+        # streamlit a second time
+        from streamlit.web import bootstrap
+        
+        flag_options = {"server.port": 8501, "server.headless": False}
         
-        print(f"📱 Opening web browser at: http://localhost:8501")
-        print("📋 Press Ctrl+C to stop the application")
-        print("")
+        sys.stdout.write("\n".join([
+            "\n🌐 Starting Streamlit application...",
+            "=" * 50,
+            "📱 Opening web browser at: http://localhost:8501",
+            "📋 Press Ctrl+C to stop the application",
+            "",
+        ]) + "\n")
         
-        subprocess.run(cmd)
+        bootstrap.load_config_options(flag_options=flag_options)
+        bootstrap.run("streamlit_app.py", False, [], flag_options)
         
     except KeyboardInterrupt:
         print("\n👋 Application stopped by user")
@@ -85,7 +185,8 @@ def run_streamlit():
 
 if __name__ == "__main__":
     nsna_folder = setup_environment()
-    print(f"\n📂 Your files will be saved to: {nsna_folder}")
-    print("🔄 Starting application...")
+    sys.stdout.write(f"\n📂 Your files will be saved to: {nsna_folder}\n🔄 Starting application...\n")
+    
+    precompile_app()
     
     run_streamlit()
@@ -1,14 +1,22 @@
 import os
 import sys
-import json
+import copy
 import logging
 from dataclasses import dataclass, asdict
+from functools import lru_cache
 from typing import List, Optional
 from pathlib import Path
+from utils.json_store import load_json, write_json_atomic
 
 # Create a module-level logger
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=None)
+def _ensure_config_dir(config_dir: Path) -> Path:
+    """Create the config directory the first time it is used in this process"""
+    config_dir.mkdir(parents=True, exist_ok=True)
+    return config_dir
+
 def get_template_file_path() -> Path:
     """Get the path to the email template settings file"""
     try:
@@ -23,8 +31,7 @@ def get_template_file_path() -> Path:
                 config_dir = Path.home() / ".nsna-mail-merge" / "config"
         
         # Ensure directory exists
-        config_dir.mkdir(parents=True, exist_ok=True)
-        template_path = config_dir / "email_template_settings.json"
+        template_path = _ensure_config_dir(config_dir) / "email_template_settings.json"
         logger.debug(f"Email template path: {template_path}")
         return template_path
         
@@ -71,20 +78,14 @@ class EmailTemplateSettings:
     def save(self) -> bool:
         """Save the email template settings to the user's configuration directory"""
         try:
+            # get_template_file_path() already creates the parent directory
             settings_file = get_template_file_path()
-            # Ensure parent directory exists
-            settings_file.parent.mkdir(parents=True, exist_ok=True)
-            
+
             # Convert to dict, excluding None values
             data = {k: v for k, v in asdict(self).items() if v is not None}
             
-            # Write to a temporary file first
-            temp_file = settings_file.with_suffix('.tmp')
-            with open(temp_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            
-            # Rename temporary file to final name
-            temp_file.replace(settings_file)
+            # Write to a temporary file first, then rename it to the final name
+            write_json_atomic(settings_file, data)
             
             logger.info(f"Email template settings saved to {settings_file}")
             return True
@@ -98,11 +99,11 @@ class EmailTemplateSettings:
         """Load email template settings from the user's configuration directory"""
         try:
             settings_file = get_template_file_path()
-            if settings_file.exists():
-                with open(settings_file, 'r') as f:
-                    data = json.load(f)
-                    logger.info(f"Loaded email template settings from {settings_file}")
-                    return cls(**data)
+            # Parsed once per file version; copied so callers can't mutate the cached lists
+            data = load_json(settings_file)
+            if data is not None:
+                logger.info(f"Loaded email template settings from {settings_file}")
+                return cls(**copy.deepcopy(data))
             else:
                 logger.info("No existing template found, using defaults")
                 return cls()
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 # Default email is used only if no "From Email" is provided in the app
@@ -6,8 +8,9 @@ DEFAULT_EMAIL = 'webcommunications@achi.org'
 # OAuth 2.0 settings - read from Streamlit secrets
 # These are application-level credentials for your Google Cloud project
 # Required for dynamic user-specific OAuth
+@lru_cache(maxsize=1)
 def get_google_credentials():
-    """Get Google OAuth credentials from Streamlit secrets with fallback"""
+    """Get Google OAuth credentials from Streamlit secrets with fallback, once per process"""
     try:
         import streamlit as st
         # Try to get from Streamlit secrets first (for cloud deployment)
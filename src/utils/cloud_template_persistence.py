@@ -8,6 +8,7 @@ import base64
 from datetime import datetime
 from pathlib import Path
 import logging
+from functools import lru_cache
 from typing import Dict, Any, Optional
 
 class CloudTemplatePersistence:
@@ -170,8 +171,12 @@ def get_letterhead_path():
     return None
 
 # Cloud-compatible settings management
+@lru_cache(maxsize=1)
 def get_cloud_email_settings():
-    """Get email settings from Streamlit secrets or fallback to defaults"""
+    """Get email settings from Streamlit secrets or fallback to defaults.
+
+    Computed once per process; callers share the returned dict and must not mutate it.
+    """
     try:
         # Try to get from Streamlit secrets first
         if hasattr(st, 'secrets') and 'email' in st.secrets:
@@ -181,7 +186,7 @@ def get_cloud_email_settings():
                 'use_tls': st.secrets.email.get('use_tls', True),
                 'default_from': st.secrets.email.get('default_from', ''),
             }
-    except:
+    except Exception:
         pass
     
     # Fallback to default settings
@@ -192,8 +197,9 @@ def get_cloud_email_settings():
         'default_from': '',
     }
 
+@lru_cache(maxsize=1)
 def get_oauth_credentials():
-    """Get OAuth credentials from Streamlit secrets"""
+    """Get OAuth credentials from Streamlit secrets, once per process (shared dict, don't mutate)"""
     try:
         if hasattr(st, 'secrets') and 'oauth' in st.secrets:
             return {
@@ -201,7 +207,7 @@ def get_oauth_credentials():
                 'client_secret': st.secrets.oauth.get('client_secret', ''),
                 'redirect_uri': st.secrets.oauth.get('redirect_uri', ''),
             }
-    except:
+    except Exception:
         pass
     
     return None
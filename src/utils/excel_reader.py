@@ -1,6 +1,9 @@
 from pathlib import Path
+import importlib.util
 import pandas as pd
-from openpyxl import load_workbook
+
+# Prefer the Rust-based calamine reader when installed; None keeps pandas' openpyxl default
+EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") is not None else None
 
 def read_excel(file_path):
     """
@@ -12,7 +15,7 @@ def read_excel(file_path):
     Returns:
         DataFrame: Pandas DataFrame containing contact information
     """
-    df = pd.read_excel(str(file_path))
+    df = pd.read_excel(str(file_path), engine=EXCEL_ENGINE)
     return df
 
 def get_contacts_as_list(df):
@@ -27,6 +30,20 @@ def get_contacts_as_list(df):
     """
     return df.to_dict('records')
 
+def iter_contacts(df):
+    """
+    Yield one contact dictionary per row without building the full list
+    
+    Args:
+        df (DataFrame): Pandas DataFrame
+    
+    Yields:
+        dict: Column name to value for a single contact
+    """
+    columns = list(df.columns)
+    for values in df.itertuples(index=False, name=None):
+        yield dict(zip(columns, values))
+
 def get_email_addresses(df):
     """Extract email addresses from the DataFrame"""
     if 'Email' in df.columns:
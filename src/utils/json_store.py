@@ -0,0 +1,68 @@
+"""
+JSON file helpers for NSNA Mail Merge Tool
+Parses settings files with orjson when available and caches them by modification time
+"""
+
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+
+    def _loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+    def _dumps(data: Any) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def _loads(data: bytes) -> Any:
+        return json.loads(data)
+
+    def _dumps(data: Any) -> bytes:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def read_json(path: Union[str, Path]) -> Optional[Any]:
+    """Parse a JSON file into a fresh object, or return None when it does not exist"""
+    try:
+        with open(path, 'rb') as f:
+            return _loads(f.read())
+    except FileNotFoundError:
+        return None
+
+
+@lru_cache(maxsize=32)
+def _load_cached(path: str, mtime_ns: int, size: int) -> Any:
+    """Parse a JSON file; mtime and size only serve as part of the cache key"""
+    return read_json(path)
+
+
+def load_json(path: Union[str, Path]) -> Optional[Any]:
+    """Load a JSON file, reusing the parsed result until the file changes.
+
+    Returns None when the file does not exist. Callers get a shared object
+    and must copy it before mutating.
+    """
+    path = os.fspath(path)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    # Size is part of the key because FAT/HFS+ mtimes are too coarse to tell
+    # a save and a read within the same second apart
+    return _load_cached(path, stat.st_mtime_ns, stat.st_size)
+
+
+def write_json_atomic(path: Union[str, Path], data: Any) -> None:
+    """Serialize data as UTF-8 in one write to a sibling temp file, then swap it into place.
+
+    Readers never see a half-written file; a crash leaves the previous version intact.
+    """
+    path = os.fspath(path)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_dumps(data))
+    os.replace(tmp_path, path)
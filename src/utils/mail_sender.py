@@ -6,12 +6,18 @@ import logging
 import base64
 from pathlib import Path
 from config.email_template_settings import EmailTemplateSettings
-import json
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
 import os
-from utils.oauth_manager import get_user_credentials
+from collections.abc import Mapping
+from utils.oauth_manager import get_user_credentials, get_cached_access_token, forget_access_tokens, refresh_user_token
+from utils.json_store import read_json
+
+# SMTP settings each authentication method needs, in the order they are reported when missing
+DYNAMIC_OAUTH_REQUIRED_SETTINGS = ('smtp_server', 'smtp_port', 'smtp_user_name', 'client_id', 'client_secret')
+OAUTH_REQUIRED_SETTINGS = DYNAMIC_OAUTH_REQUIRED_SETTINGS + ('refresh_token',)
+PASSWORD_REQUIRED_SETTINGS = ('smtp_server', 'smtp_port', 'smtp_user_name', 'smtp_password')
 
 # OAuth2 SMTP authentication mechanism
 def generate_oauth2_string(username, access_token):
@@ -25,34 +31,41 @@ def get_oauth_access_token(user_email, client_id, client_secret, refresh_token=N
     
     If dynamic user OAuth is enabled, it will get credentials for the specific user.
     Otherwise, it will use the provided refresh token.
+    Tokens are cached until shortly before they expire, so a mail merge fetches one per account.
     """
     try:
         # Check if we're using dynamic user OAuth
         if user_email and dynamic_user_oauth:
-            logging.info(f"Using dynamic OAuth for {user_email}")
-            
-            # Get user-specific credentials - this will trigger browser auth only if needed
-            creds = get_user_credentials(user_email, client_id, client_secret)
-            if not creds:
-                raise ValueError(f"Failed to get OAuth credentials for {user_email}")
+            def fetch_user_credentials():
+                logging.info(f"Using dynamic OAuth for {user_email}")
+                
+                # Get user-specific credentials - this will trigger browser auth only if needed
+                creds = get_user_credentials(user_email, client_id, client_secret)
+                if not creds:
+                    raise ValueError(f"Failed to get OAuth credentials for {user_email}")
+                
+                logging.info(f"Successfully obtained token for {user_email}")
+                return creds
             
-            logging.info(f"Successfully obtained token for {user_email}")
-            return creds.token
+            return get_cached_access_token(client_id, user_email, fetch_user_credentials)
         
         # Traditional OAuth with refresh token from settings
         elif refresh_token:
-            creds = Credentials.from_authorized_user_info(
-                info={
-                    "client_id": client_id,
-                    "client_secret": client_secret,
-                    "refresh_token": refresh_token,
-                    "token_uri": "https://oauth2.googleapis.com/token"
-                }
-            )
+            def refresh_credentials():
+                creds = Credentials.from_authorized_user_info(
+                    info={
+                        "client_id": client_id,
+                        "client_secret": client_secret,
+                        "refresh_token": refresh_token,
+                        "token_uri": "https://oauth2.googleapis.com/token"
+                    }
+                )
+                
+                # Refresh the token
+                creds.refresh(Request())
+                return creds
             
-            # Refresh the token
-            creds.refresh(Request())
-            return creds.token
+            return get_cached_access_token(client_id, refresh_token, refresh_credentials)
             
         else:
             raise ValueError("No refresh token provided and dynamic OAuth is disabled")
@@ -62,11 +75,191 @@ def get_oauth_access_token(user_email, client_id, client_secret, refresh_token=N
         raise
 
 
-def send_email(from_email, to_email, subject, html_content, attachment_path=None, smtp_settings=None, is_test=False):
+def open_smtp_connection(from_email, smtp_settings):
+    """Connect, start TLS and authenticate; returns a server ready for send_message"""
+    use_oauth = smtp_settings.get('use_oauth', False)
+    
+    # Use different auth methods depending on settings
+    smtp_timeout = 30  # 30 second timeout
+    max_retries = 3
+    retry_delay = 5  # seconds
+    
+    for attempt in range(max_retries):
+        try:
+            logging.info(f"Attempting SMTP connection (attempt {attempt + 1}/{max_retries})")
+            
+            # Create SMTP connection with timeout
+            server = smtplib.SMTP(smtp_settings['smtp_server'], smtp_settings['smtp_port'], timeout=smtp_timeout)
+            server.set_debuglevel(1 if logging.getLogger().level == logging.DEBUG else 0)
+            
+            # Start TLS encryption
+            logging.info("Starting TLS encryption...")
+            server.starttls()
+            break  # Connection successful
+            
+        except (smtplib.SMTPConnectError, OSError, TimeoutError) as conn_error:
+            logging.warning(f"SMTP connection attempt {attempt + 1} failed: {str(conn_error)}")
+            
+            if attempt < max_retries - 1:  # Not the last attempt
+                logging.info(f"Retrying in {retry_delay} seconds...")
+                import time
+                time.sleep(retry_delay)
+            else:
+                # Last attempt failed
+                error_msg = f"Failed to connect to {smtp_settings['smtp_server']}:{smtp_settings['smtp_port']} after {max_retries} attempts.\n\n"
+                
+                if "10060" in str(conn_error) or "timeout" in str(conn_error).lower():
+                    error_msg += "This appears to be a network timeout issue. Possible solutions:\n"
+                    error_msg += "• Check your internet connection\n"
+                    error_msg += "• Verify firewall settings (allow port 587)\n"
+                    error_msg += "• Contact your ISP if they block SMTP\n"
+                    error_msg += "• Try using a VPN if on a corporate network\n"
+                    error_msg += "• Check if antivirus is blocking the connection"
+                
+                raise ConnectionError(error_msg) from conn_error
+    
+    try:
+        # Determine which email address to use for SMTP authentication
+        auth_email = from_email if from_email else smtp_settings['smtp_user_name']
+        
+        # Ensure auth_email is clean without any display name parts
+        if '<' in auth_email and '>' in auth_email:
+            auth_email = auth_email[auth_email.find('<')+1:auth_email.find('>')]
+        auth_email = auth_email.strip()
+        
+        if use_oauth:
+            # Use OAuth 2.0 authentication
+            try:
+                dynamic_oauth = smtp_settings.get('dynamic_user_oauth', False)
+                logging.info(f"Using {'dynamic user ' if dynamic_oauth else ''}OAuth 2.0 authentication for SMTP")
+                
+                # Get access token - using either dynamic user OAuth or refresh token
+                try:
+                    logging.info(f"Getting OAuth access token for {auth_email}")
+                    access_token = get_oauth_access_token(
+                        auth_email if dynamic_oauth else None,
+                        smtp_settings['client_id'],
+                        smtp_settings['client_secret'],
+                        smtp_settings.get('refresh_token'),
+                        dynamic_user_oauth=dynamic_oauth
+                    )
+                    logging.info(f"Successfully obtained access token for {auth_email}")
+                except Exception as token_error:
+                    logging.error(f"Error getting OAuth token for {auth_email}: {str(token_error)}")
+                    raise
+                
+                # Generate the authentication string
+                auth_string = generate_oauth2_string(
+                    auth_email,  # Use the from_email for authentication
+                    access_token
+                )
+                
+                # Using a more robust approach for XOAUTH2 authentication
+                # Close and reopen connection to ensure we start fresh
+                server.close()
+                server = smtplib.SMTP(smtp_settings['smtp_server'], smtp_settings['smtp_port'])
+                server.starttls()
+                server.ehlo()
+                
+                logging.info(f"Attempting OAuth2 login for {auth_email}")
+                
+                # Custom implementation of XOAUTH2 authentication
+                auth_message = f"user={auth_email}\x01auth=Bearer {access_token}\x01\x01"
+                auth_message_base64 = base64.b64encode(auth_message.encode('utf-8')).decode('utf-8')
+                
+                # Initial AUTH command
+                code, resp = server.docmd("AUTH", f"XOAUTH2 {auth_message_base64}")
+                
+                if code == 235:
+                    # Authentication successful
+                    logging.info(f"OAuth2 authentication successful for {auth_email}")
+                elif code == 334:
+                    # Server is expecting client response to a challenge
+                    # Send empty response as required by protocol
+                    code, resp = server.docmd("", "")
+                    if code != 235:
+                        error_msg = resp.decode() if isinstance(resp, bytes) else str(resp)
+                        logging.error(f"XOAUTH2 challenge-response failed: {code} - {error_msg}")
+                        raise smtplib.SMTPAuthenticationError(code, error_msg)
+                else:
+                    # Authentication failed
+                    error_msg = resp.decode() if isinstance(resp, bytes) else str(resp)
+                    logging.error(f"XOAUTH2 authentication failed: {code} - {error_msg}")
+                    raise smtplib.SMTPAuthenticationError(code, error_msg)
+                    
+                logging.info(f"Successfully authenticated with OAuth as {auth_email}")
+                
+            except Exception as oauth_error:
+                logging.error(f"OAuth authentication failed for {auth_email}: {str(oauth_error)}")
+                if isinstance(oauth_error, smtplib.SMTPAuthenticationError):
+                    # The access token was rejected (e.g. revoked); fetch a new one next time
+                    if dynamic_oauth:
+                        # The token file holds the rejected token too, so refresh it on disk
+                        try:
+                            refresh_user_token(auth_email)
+                        except Exception as refresh_error:
+                            logging.error(f"Error refreshing stored token for {auth_email}: {str(refresh_error)}")
+                    else:
+                        forget_access_tokens(smtp_settings.get('refresh_token'))
+                raise
+        else:
+            # Use traditional password authentication
+            logging.info(f"Using password authentication for SMTP as {smtp_settings['smtp_user_name']}")
+            server.login(smtp_settings['smtp_user_name'], smtp_settings['smtp_password'])
+            
+    except Exception:
+        # Don't leave the socket open when authentication fails
+        try:
+            server.quit()
+        except:
+            pass
+        raise
+    
+    return server
+
+
+class SMTPSession:
+    """One authenticated SMTP connection shared by every send_email call in a mail merge.
+    
+    The connection is opened on first use and re-opened once if the server drops it.
+    """
+    
+    def __init__(self, from_email, smtp_settings):
+        self.from_email = from_email
+        self.smtp_settings = smtp_settings
+        self.server = None
+    
+    def send_message(self, msg):
+        if self.server is None:
+            self.server = open_smtp_connection(self.from_email, self.smtp_settings)
+        try:
+            self.server.send_message(msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionResetError, BrokenPipeError) as e:
+            logging.warning(f"SMTP connection dropped ({str(e)}), reconnecting")
+            self.close()
+            self.server = open_smtp_connection(self.from_email, self.smtp_settings)
+            self.server.send_message(msg)
+    
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except:
+                pass
+            self.server = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def send_email(from_email, to_email, subject, html_content, attachment_path=None, smtp_settings=None, is_test=False, session=None):
     """Send email with attachments"""
     try:
         # Validate SMTP settings
-        if not smtp_settings or not isinstance(smtp_settings, dict):
+        if not smtp_settings or not isinstance(smtp_settings, Mapping):
             raise ValueError("SMTP settings must be provided")
         
         # Check if we're using OAuth or password auth
@@ -77,13 +270,13 @@ def send_email(from_email, to_email, subject, html_content, attachment_path=None
         if use_oauth:
             if dynamic_user_oauth:
                 # For dynamic user OAuth, we need client ID and secret
-                required_settings = ['smtp_server', 'smtp_port', 'smtp_user_name', 'client_id', 'client_secret']
+                required_settings = DYNAMIC_OAUTH_REQUIRED_SETTINGS
             else:
                 # For traditional OAuth, we also need a refresh token
-                required_settings = ['smtp_server', 'smtp_port', 'smtp_user_name', 'client_id', 'client_secret', 'refresh_token']
+                required_settings = OAUTH_REQUIRED_SETTINGS
         else:
             # For password authentication
-            required_settings = ['smtp_server', 'smtp_port', 'smtp_user_name', 'smtp_password']
+            required_settings = PASSWORD_REQUIRED_SETTINGS
             
         # Check for missing settings
         missing_settings = [s for s in required_settings if s not in smtp_settings or not smtp_settings[s]]
@@ -129,135 +322,19 @@ def send_email(from_email, to_email, subject, html_content, attachment_path=None
         elif attachment_path:
             logging.warning(f"Attachment path provided but file not found: {attachment_path}")
         
-        # Send email - use different auth methods depending on settings
-        smtp_timeout = 30  # 30 second timeout
-        max_retries = 3
-        retry_delay = 5  # seconds
-        
-        for attempt in range(max_retries):
+        # Send email - reuse the caller's open connection when one is provided
+        if session is not None:
+            session.send_message(msg)
+        else:
+            server = open_smtp_connection(from_email, smtp_settings)
             try:
-                logging.info(f"Attempting SMTP connection (attempt {attempt + 1}/{max_retries})")
-                
-                # Create SMTP connection with timeout
-                server = smtplib.SMTP(smtp_settings['smtp_server'], smtp_settings['smtp_port'], timeout=smtp_timeout)
-                server.set_debuglevel(1 if logging.getLogger().level == logging.DEBUG else 0)
-                
-                # Start TLS encryption
-                logging.info("Starting TLS encryption...")
-                server.starttls()
-                break  # Connection successful
-                
-            except (smtplib.SMTPConnectError, OSError, TimeoutError) as conn_error:
-                logging.warning(f"SMTP connection attempt {attempt + 1} failed: {str(conn_error)}")
-                
-                if attempt < max_retries - 1:  # Not the last attempt
-                    logging.info(f"Retrying in {retry_delay} seconds...")
-                    import time
-                    time.sleep(retry_delay)
-                else:
-                    # Last attempt failed
-                    error_msg = f"Failed to connect to {smtp_settings['smtp_server']}:{smtp_settings['smtp_port']} after {max_retries} attempts.\n\n"
-                    
-                    if "10060" in str(conn_error) or "timeout" in str(conn_error).lower():
-                        error_msg += "This appears to be a network timeout issue. Possible solutions:\n"
-                        error_msg += "• Check your internet connection\n"
-                        error_msg += "• Verify firewall settings (allow port 587)\n"
-                        error_msg += "• Contact your ISP if they block SMTP\n"
-                        error_msg += "• Try using a VPN if on a corporate network\n"
-                        error_msg += "• Check if antivirus is blocking the connection"
-                    
-                    raise ConnectionError(error_msg) from conn_error
-        
-        try:
-            # Determine which email address to use for SMTP authentication
-            auth_email = from_email if from_email else smtp_settings['smtp_user_name']
-            
-            # Ensure auth_email is clean without any display name parts
-            if '<' in auth_email and '>' in auth_email:
-                auth_email = auth_email[auth_email.find('<')+1:auth_email.find('>')]
-            auth_email = auth_email.strip()
-            
-            if use_oauth:
-                # Use OAuth 2.0 authentication
+                server.send_message(msg)
+            finally:
+                # Ensure server connection is closed
                 try:
-                    dynamic_oauth = smtp_settings.get('dynamic_user_oauth', False)
-                    logging.info(f"Using {'dynamic user ' if dynamic_oauth else ''}OAuth 2.0 authentication for SMTP")
-                    
-                    # Get access token - using either dynamic user OAuth or refresh token
-                    try:
-                        logging.info(f"Getting OAuth access token for {auth_email}")
-                        access_token = get_oauth_access_token(
-                            auth_email if dynamic_oauth else None,
-                            smtp_settings['client_id'],
-                            smtp_settings['client_secret'],
-                            smtp_settings.get('refresh_token'),
-                            dynamic_user_oauth=dynamic_oauth
-                        )
-                        logging.info(f"Successfully obtained access token for {auth_email}")
-                    except Exception as token_error:
-                        logging.error(f"Error getting OAuth token for {auth_email}: {str(token_error)}")
-                        raise
-                    
-                    # Generate the authentication string
-                    auth_string = generate_oauth2_string(
-                        auth_email,  # Use the from_email for authentication
-                        access_token
-                    )
-                    
-                    # Using a more robust approach for XOAUTH2 authentication
-                    # Close and reopen connection to ensure we start fresh
-                    server.close()
-                    server = smtplib.SMTP(smtp_settings['smtp_server'], smtp_settings['smtp_port'])
-                    server.starttls()
-                    server.ehlo()
-                    
-                    logging.info(f"Attempting OAuth2 login for {auth_email}")
-                    
-                    # Custom implementation of XOAUTH2 authentication
-                    auth_message = f"user={auth_email}\x01auth=Bearer {access_token}\x01\x01"
-                    auth_message_base64 = base64.b64encode(auth_message.encode('utf-8')).decode('utf-8')
-                    
-                    # Initial AUTH command
-                    code, resp = server.docmd("AUTH", f"XOAUTH2 {auth_message_base64}")
-                    
-                    if code == 235:
-                        # Authentication successful
-                        logging.info(f"OAuth2 authentication successful for {auth_email}")
-                    elif code == 334:
-                        # Server is expecting client response to a challenge
-                        # Send empty response as required by protocol
-                        code, resp = server.docmd("", "")
-                        if code != 235:
-                            error_msg = resp.decode() if isinstance(resp, bytes) else str(resp)
-                            logging.error(f"XOAUTH2 challenge-response failed: {code} - {error_msg}")
-                            raise smtplib.SMTPAuthenticationError(code, error_msg)
-                    else:
-                        # Authentication failed
-                        error_msg = resp.decode() if isinstance(resp, bytes) else str(resp)
-                        logging.error(f"XOAUTH2 authentication failed: {code} - {error_msg}")
-                        raise smtplib.SMTPAuthenticationError(code, error_msg)
-                        
-                    logging.info(f"Successfully authenticated with OAuth as {auth_email}")
-                    
-                except Exception as oauth_error:
-                    logging.error(f"OAuth authentication failed for {auth_email}: {str(oauth_error)}")
-                    raise
-            else:
-                # Use traditional password authentication
-                logging.info(f"Using password authentication for SMTP as {smtp_settings['smtp_user_name']}")
-                server.login(smtp_settings['smtp_user_name'], smtp_settings['smtp_password'])
-                
-            server.send_message(msg)
-            
-        except Exception as e:
-            logging.error(f"Failed to send email: {str(e)}")
-            raise
-        finally:
-            # Ensure server connection is closed
-            try:
-                server.quit()
-            except:
-                pass
+                    server.quit()
+                except:
+                    pass
             
         logging.info(f"{'Test email' if is_test else 'Email'} sent successfully to {actual_recipient} using {'OAuth' if use_oauth else 'password'} authentication")
         return True
@@ -270,9 +347,9 @@ def load_email_template():
     """Load email template settings"""
     try:
         settings_path = Path.cwd() / 'config' / 'email_template_settings.json'
-        if settings_path.exists():
-            with open(settings_path) as f:
-                return EmailTemplateSettings(**json.load(f))
+        data = read_json(settings_path)
+        if data is not None:
+            return EmailTemplateSettings(**data)
         return EmailTemplateSettings()
     except Exception as e:
         logging.error(f"Failed to load email template: {str(e)}")
@@ -293,11 +370,10 @@ def send_email_with_multiple_attachments(from_email, to_email, subject, html_con
     """Send email with multiple attachments"""
     try:
         # Validate SMTP settings
-        if not smtp_settings or not isinstance(smtp_settings, dict):
+        if not smtp_settings or not isinstance(smtp_settings, Mapping):
             raise ValueError("SMTP settings must be provided")
             
-        required_settings = ['smtp_server', 'smtp_port', 'smtp_user_name', 'smtp_password']
-        missing_settings = [s for s in required_settings if s not in smtp_settings]
+        missing_settings = [s for s in PASSWORD_REQUIRED_SETTINGS if s not in smtp_settings]
         if missing_settings:
             raise ValueError(f"Missing required SMTP settings: {', '.join(missing_settings)}")
         
@@ -357,7 +433,7 @@ def send_email_with_multiple_attachments(from_email, to_email, subject, html_con
         logging.error(f"Failed to send email with multiple attachments: {str(e)}")
         return False
 
-def send_email_with_diagnostics(from_email, to_email, subject, html_content, attachment_path=None, smtp_settings=None, is_test=False):
+def send_email_with_diagnostics(from_email, to_email, subject, html_content, attachment_path=None, smtp_settings=None, is_test=False, session=None):
     """
     Send email with enhanced error handling and network diagnostics
     
@@ -365,7 +441,7 @@ def send_email_with_diagnostics(from_email, to_email, subject, html_content, att
     when email sending fails, particularly for network-related issues.
     """
     try:
-        return send_email(from_email, to_email, subject, html_content, attachment_path, smtp_settings, is_test)
+        return send_email(from_email, to_email, subject, html_content, attachment_path, smtp_settings, is_test, session)
     
     except ConnectionError as e:
         # Handle connection-specific errors with detailed diagnostics
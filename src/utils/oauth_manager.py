@@ -9,6 +9,10 @@ and dynamic authentication for users.
 import os
 import json
 import logging
+import threading
+import time
+from datetime import timezone
+from functools import lru_cache
 from pathlib import Path
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.oauth2.credentials import Credentials
@@ -17,8 +21,28 @@ from google.auth.transport.requests import Request
 # Gmail API scopes required for SMTP access
 SCOPES = ['https://mail.google.com/']
 
+# Google access tokens live an hour; cached ones are replaced this many seconds early
+ACCESS_TOKEN_TTL = 3600
+ACCESS_TOKEN_REFRESH_MARGIN = 300
+
+# (client_id, account) -> (access_token, expires_at epoch seconds), shared by all sessions
+_access_tokens = {}
+# (client_id, account) -> lock serializing fetches for that account only
+_access_token_fetch_locks = {}
+# Guards the two dicts above; never held while fetching
+_access_tokens_lock = threading.Lock()
+
+def _cached_access_token(key):
+    """Return the cached token for key if it is not about to expire, else None"""
+    with _access_tokens_lock:
+        cached = _access_tokens.get(key)
+    if cached and time.time() < cached[1] - ACCESS_TOKEN_REFRESH_MARGIN:
+        return cached[0]
+    return None
+
+@lru_cache(maxsize=1)
 def get_tokens_dir():
-    """Return the directory path for storing user tokens"""
+    """Return the directory path for storing user tokens, creating it on first use"""
     tokens_dir = Path(__file__).parent.parent / 'user_tokens'
     tokens_dir.mkdir(exist_ok=True)
     return tokens_dir
@@ -49,12 +73,14 @@ def get_user_credentials(email, client_id, client_secret):
     creds = None
     
     # Check if we have a valid token file
-    if token_path and token_path.exists():
+    if token_path:
         try:
             with open(token_path, 'r') as token:
                 creds_data = json.load(token)
                 creds = Credentials.from_authorized_user_info(
                     creds_data, SCOPES)
+        except FileNotFoundError:
+            pass  # First sign-in for this user
         except Exception as e:
             logging.error(f"Error loading credentials: {e}")
             # Continue to authentication flow if loading failed
@@ -92,8 +118,7 @@ def get_user_credentials(email, client_id, client_secret):
                 
                 # Save the credentials
                 if token_path:
-                    with open(token_path, 'w') as token:
-                        token.write(creds.to_json())
+                    save_user_credentials(token_path, creds)
                         
                 logging.info(f"Successfully authenticated {email}")
                         
@@ -103,6 +128,94 @@ def get_user_credentials(email, client_id, client_secret):
                 
     return creds
 
+def save_user_credentials(token_path, creds):
+    """Write credentials to the user's token file"""
+    with open(token_path, 'w') as token:
+        token.write(creds.to_json())
+
+def refresh_user_token(email):
+    """
+    Force a refresh of the stored token for a user whose access token was rejected
+    
+    The refreshed token is written back to the token file, so the next sign-in
+    doesn't reload the rejected one. If the refresh fails (e.g. the grant was
+    revoked) the token file is removed and the next sign-in runs the OAuth flow.
+    
+    Args:
+        email: The user's email address
+        
+    Returns:
+        True if a refreshed token was saved, False otherwise
+    """
+    forget_access_tokens(email)
+    token_path = get_user_token_path(email)
+    if not token_path:
+        return False
+    
+    try:
+        with open(token_path, 'r') as token:
+            creds = Credentials.from_authorized_user_info(json.load(token), SCOPES)
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        logging.error(f"Error loading credentials for {email}: {e}")
+        return False
+    
+    try:
+        creds.refresh(Request())
+    except Exception as e:
+        logging.error(f"Error refreshing token for {email}: {e}")
+        clear_user_token(email)
+        return False
+    
+    save_user_credentials(token_path, creds)
+    return True
+
+def get_cached_access_token(client_id, account, fetch_credentials):
+    """
+    Return an access token for the account, reusing a cached one until it nears expiry
+    
+    Args:
+        client_id: The OAuth client ID
+        account: The user's email address (or refresh token) the token belongs to
+        fetch_credentials: Callable returning Credentials with a valid token
+        
+    Returns:
+        The access token string
+    """
+    key = (client_id, account)
+    token = _cached_access_token(key)
+    if token:
+        return token
+    
+    with _access_tokens_lock:
+        fetch_lock = _access_token_fetch_locks.setdefault(key, threading.Lock())
+    
+    # One refresh or sign-in per account at a time; a browser consent waiting here
+    # doesn't block other accounts or cache hits
+    with fetch_lock:
+        token = _cached_access_token(key)
+        if token:
+            return token
+        
+        creds = fetch_credentials()
+        if not creds.token:
+            raise ValueError(f"OAuth credentials for {account} have no access token")
+        if creds.expiry:
+            # google-auth reports expiry as a naive UTC datetime
+            expires_at = creds.expiry.replace(tzinfo=timezone.utc).timestamp()
+        else:
+            expires_at = time.time() + ACCESS_TOKEN_TTL
+        with _access_tokens_lock:
+            _access_tokens[key] = (creds.token, expires_at)
+        return creds.token
+
+def forget_access_tokens(account):
+    """Drop cached access tokens for the account so the next send fetches a new one"""
+    with _access_tokens_lock:
+        for key in [key for key in _access_tokens if key[1] == account]:
+            del _access_tokens[key]
+
 def clear_user_token(email):
     """
     Clear the stored token for a specific user
@@ -110,11 +223,14 @@ def clear_user_token(email):
     Args:
         email: The user's email address
     """
+    forget_access_tokens(email)
     token_path = get_user_token_path(email)
-    if token_path and token_path.exists():
+    if token_path:
         try:
             os.remove(token_path)
             return True
+        except FileNotFoundError:
+            return False
         except Exception as e:
             logging.error(f"Error clearing token for {email}: {e}")
             return False
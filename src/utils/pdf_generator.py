@@ -1,11 +1,14 @@
 from fpdf import FPDF
 from datetime import datetime
 import logging
+import os
 from pathlib import Path
 import PyPDF2
 import io
 import tempfile
 import re
+import uuid
+from functools import lru_cache
 from html import unescape
 
 # Configure logging to be more verbose for debugging
@@ -16,7 +19,7 @@ try:
     from reportlab.pdfgen import canvas
     from reportlab.lib.pagesizes import letter
     from reportlab.lib.units import inch
-    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
     from reportlab.lib import colors
     REPORTLAB_AVAILABLE = True
@@ -29,13 +32,87 @@ except ImportError:
 IRONPDF_AVAILABLE = False
 logging.info("📋 IronPDF disabled due to runtime issues, using ReportLab as primary method")
 
+# Get the root directory of the project (go up from src/utils/ to root)
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# {Variable} placeholders in receipt content; the app imports this for the emails too
+TEMPLATE_VARIABLE_PATTERN = re.compile(r'\{([^{}]+)\}')
+
+# Characters dropped from donor names when building receipt filenames
+UNSAFE_FILENAME_CHARS = re.compile(r'[^\w \-]')
+
+# Receipts are written to the system temp directory, resolved once per process
+RECEIPTS_DIR = Path(tempfile.gettempdir())
+
+def unique_timestamp(now):
+    """Filename timestamp plus a random tag; receipts rendered on parallel threads
+    in the same second (e.g. two rows for one donor) must never share a path"""
+    return f"{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+def _letterhead_candidates(template_data):
+    """Letterhead PDF locations in priority order"""
+    explicit_path = template_data.get('template_path')
+    return [
+        PROJECT_ROOT / 'NSNA Atlanta Letterhead Updated.pdf',  # Root directory
+        PROJECT_ROOT / 'src' / 'templates' / 'letterhead_template.pdf',  # Templates directory
+        Path(explicit_path) if explicit_path else None  # Explicit path from template
+    ]
+
+def find_first_existing(candidates):
+    """Return the first existing path, listing each parent directory at most once"""
+    listings = {}
+    for path in candidates:
+        if not path:
+            continue
+        parent = path.parent
+        if parent not in listings:
+            try:
+                with os.scandir(parent) as entries:
+                    listings[parent] = {entry.name for entry in entries}
+            except OSError:
+                listings[parent] = set()
+        if path.name in listings[parent]:
+            return path
+    return None
+
+@lru_cache(maxsize=1)
+def _html_paragraph_style():
+    """Body style for the HTML receipt; built once since Paragraph only reads it"""
+    styles = getSampleStyleSheet()
+    
+    # Custom style that handles HTML properly with normal spacing
+    return ParagraphStyle(
+        'CustomNormal',
+        parent=styles['Normal'],
+        fontName='Helvetica',
+        fontSize=11,
+        leading=13,              # Normal line spacing (1.2x font size)
+        spaceAfter=4,            # Minimal space after paragraphs
+        spaceBefore=0,           # No space before paragraphs
+        allowWidows=1,
+        allowOrphans=1,
+        wordWrap='CJK'           # Better word wrapping
+    )
+
+@lru_cache(maxsize=4)
+def _read_letterhead_cached(path, mtime_ns, size):
+    """Read the letterhead file; mtime and size only serve as part of the cache key"""
+    with open(path, 'rb') as letterhead_file:
+        return letterhead_file.read()
+
+def read_letterhead_bytes(letterhead_path):
+    """Letterhead PDF bytes, read from disk once and again only when the file changes"""
+    # Cwd-relative (app) and PROJECT_ROOT-based (generator) spellings share one entry
+    path = os.path.realpath(letterhead_path)
+    stat = os.stat(path)
+    # Size too, since coarse (FAT/HFS+) mtimes can miss a replacement within the same second
+    return _read_letterhead_cached(path, stat.st_mtime_ns, stat.st_size)
+
 class PDFGenerator:
     def __init__(self, template_path=None):
         self.template_path = template_path
-        self.pdf = FPDF()
-        self.pdf.add_page()
-        self.pdf.set_auto_page_break(auto=True, margin=15)
-        self.pdf.set_margins(20, 20, 20)
+        # Every generate_* method starts its own FPDF document, so don't build one up front
+        self.pdf = None
     
     def _convert_template_content(self):
         """Add basic letterhead content for PDF template"""
@@ -51,7 +128,7 @@ class PDFGenerator:
             self.pdf.ln(10)
             
         except Exception as e:
-            logging.error(f"Error converting template: {str(e)}")
+            logging.error("Error converting template: %s", e)
             raise
 
 
@@ -65,7 +142,7 @@ class PDFGenerator:
             
             # First, add the letterhead content from template
             if self.template_path:
-                logging.info(f"Using template from: {self.template_path}")
+                logging.info("Using template from: %s", self.template_path)
                 self._convert_template_content()
             
             # Add receipt header
@@ -92,27 +169,26 @@ class PDFGenerator:
             self.pdf.multi_cell(0, 10, 'This letter serves as your official receipt for tax purposes.')
             
             # Generate unique filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = unique_timestamp(datetime.now())
             filename = output_dir / f'receipt_{donor_info["First Name"]}_{donor_info["Last Name"]}_{timestamp}.pdf'
             
             # Save PDF
             self.pdf.output(str(filename))
-            logging.info(f"Generated PDF receipt: {filename}")
+            logging.info("Generated PDF receipt: %s", filename)
             
             return filename
 
         except Exception as e:
-            logging.error(f"Failed to generate PDF: {str(e)}")
+            logging.error("Failed to generate PDF: %s", e)
             raise
 
     def generate_receipt(self, receipt_data):
         """Generate PDF receipt - compatibility method for Streamlit app"""
         try:
-            logging.info(f"generate_receipt called with keys: {list(receipt_data.keys())}")
+            logging.info("generate_receipt called with keys: %s", list(receipt_data.keys()))
             
-            # Create temporary output directory
-            import tempfile
-            output_dir = Path(tempfile.gettempdir())
+            # Write to the temporary receipts directory
+            output_dir = RECEIPTS_DIR
             
             # Convert receipt_data to donor_info format expected by generate_donation_receipt
             donor_info = {
@@ -123,18 +199,18 @@ class PDFGenerator:
                 'Value of Item': receipt_data.get('Value of Item', 0)
             }
             
-            logging.info(f"Converted donor_info: {donor_info}")
+            logging.info("Converted donor_info: %s", donor_info)
             
             # If template path is provided in receipt_data, use it
             if 'template_path' in receipt_data:
                 self.template_path = receipt_data['template_path']
-                logging.info(f"Using template_path: {self.template_path}")
+                logging.info("Using template_path: %s", self.template_path)
             
             # Generate enhanced receipt with custom content
             return self.generate_enhanced_receipt(donor_info, receipt_data, output_dir)
             
         except Exception as e:
-            logging.error(f"Failed to generate receipt: {str(e)}")
+            logging.error("Failed to generate receipt: %s", str(e))
             raise
 
     def generate_enhanced_receipt(self, donor_info, template_data, output_dir):
@@ -147,7 +223,7 @@ class PDFGenerator:
                     result = self.generate_html_pdf_reportlab(donor_info, template_data, output_dir)
                     return result
                 except Exception as reportlab_error:
-                    logging.error(f"ReportLab method failed: {reportlab_error}")
+                    logging.error("ReportLab method failed: %s", reportlab_error)
                     # Fall through to PyPDF2 method
             
             # FALLBACK: PyPDF2 with regex parsing (legacy method)
@@ -156,39 +232,28 @@ class PDFGenerator:
                 result = self.generate_enhanced_receipt_pypdf2(donor_info, template_data, output_dir)
                 return result
             except Exception as pypdf2_error:
-                logging.error(f"PyPDF2 method failed: {pypdf2_error}")
+                logging.error("PyPDF2 method failed: %s", pypdf2_error)
                 # Fall through to simple receipt
                 
         except Exception as e:
-            logging.error(f"PDF generation failed: {str(e)}")
+            logging.error("PDF generation failed: %s", e)
             # Ultimate fallback to simple receipt
             return self._generate_simple_receipt(donor_info, template_data, output_dir)
 
     def generate_enhanced_receipt_pypdf2(self, donor_info, template_data, output_dir):
         """Generate PDF receipt with custom template content overlaid on letterhead PDF"""
         try:
-            logging.info(f"generate_enhanced_receipt called with template_data keys: {list(template_data.keys())}")
-            logging.info(f"Template data structure: {template_data}")
+            logging.info("generate_enhanced_receipt called with template_data keys: %s", list(template_data.keys()))
+            logging.info("Template data structure: %s", template_data)
             
             # Check for letterhead PDF - try both locations
-            letterhead_paths = [
-                Path(__file__).parent.parent.parent / 'NSNA Atlanta Letterhead Updated.pdf',  # Root directory
-                Path(__file__).parent.parent / 'templates' / 'letterhead_template.pdf',  # Templates directory
-                Path(template_data.get('template_path', '')) if template_data.get('template_path') else None  # Explicit path from template
-            ]
-            
-            letterhead_path = None
-            for path in letterhead_paths:
-                if path and path.exists():
-                    letterhead_path = path
-                    logging.info(f"Found letterhead at: {letterhead_path}")
-                    break
+            letterhead_path = find_first_existing(_letterhead_candidates(template_data))
             
             if not letterhead_path:
                 logging.warning("No letterhead PDF found, creating receipt without letterhead")
                 return self._generate_simple_receipt(donor_info, template_data, output_dir)
             
-            logging.info(f"Using letterhead from: {letterhead_path}")
+            logging.info("Using letterhead from: %s", letterhead_path)
             
             # Create content PDF with FPDF - using transparent background
             content_pdf_buffer = io.BytesIO()
@@ -213,14 +278,13 @@ class PDFGenerator:
                 logging.info("✅ Using new consolidated content structure")
                 # New consolidated structure - use the complete content
                 content = template_data['content']
-                logging.info(f"🔍 ORIGINAL CONTENT DEBUG:")
-                logging.info(f"   Content type: {type(content)}")
-                logging.info(f"   Content length: {len(content)} characters")
-                logging.info(f"   First 200 chars: {content[:200]}...")
-                logging.info(f"   Last 100 chars: ...{content[-100:]}")
+                logging.info("🔍 ORIGINAL CONTENT DEBUG:")
+                logging.info("   Content type: %s", type(content))
+                logging.info("   Content length: %s characters", len(content))
+                logging.info("   First 200 chars: %s...", content[:200])
+                logging.info("   Last 100 chars: ...%s", content[-100:])
                 
                 # Check for HTML tags in original content
-                import re
                 strong_tags = re.findall(r'</?(?:strong|b)[^>]*>', content, re.IGNORECASE)
                 em_tags = re.findall(r'</?(?:em|i)[^>]*>', content, re.IGNORECASE)
                 p_tags = re.findall(r'</?p[^>]*>', content, re.IGNORECASE)
@@ -229,14 +293,14 @@ class PDFGenerator:
                 markdown_bold = re.findall(r'\*\*[^*]+\*\*', content)
                 markdown_italic = re.findall(r'\*[^*]+\*', content)
                 
-                logging.info(f"🔍 ORIGINAL HTML TAGS FOUND:")
-                logging.info(f"   Strong/B tags: {len(strong_tags)} - {strong_tags[:5]}")
-                logging.info(f"   Em/I tags: {len(em_tags)} - {em_tags[:5]}")
-                logging.info(f"   P tags: {len(p_tags)} - {p_tags[:5]}")
+                logging.info("🔍 ORIGINAL HTML TAGS FOUND:")
+                logging.info("   Strong/B tags: %s - %s", len(strong_tags), strong_tags[:5])
+                logging.info("   Em/I tags: %s - %s", len(em_tags), em_tags[:5])
+                logging.info("   P tags: %s - %s", len(p_tags), p_tags[:5])
                 
-                logging.info(f"🔍 MARKDOWN FORMATTING FOUND:")
-                logging.info(f"   **bold** patterns: {len(markdown_bold)} - {markdown_bold[:5]}")
-                logging.info(f"   *italic* patterns: {len(markdown_italic)} - {markdown_italic[:5]}")
+                logging.info("🔍 MARKDOWN FORMATTING FOUND:")
+                logging.info("   **bold** patterns: %s - %s", len(markdown_bold), markdown_bold[:5])
+                logging.info("   *italic* patterns: %s - %s", len(markdown_italic), markdown_italic[:5])
                 
                 if not strong_tags and not em_tags and (markdown_bold or markdown_italic):
                     logging.info("🔄 CONVERTING MARKDOWN TO HTML...")
@@ -253,10 +317,10 @@ class PDFGenerator:
                     strong_tags_after = re.findall(r'</?(?:strong|b)[^>]*>', content, re.IGNORECASE)
                     em_tags_after = re.findall(r'</?(?:em|i)[^>]*>', content, re.IGNORECASE)
                     
-                    logging.info(f"✅ MARKDOWN CONVERSION COMPLETE:")
-                    logging.info(f"   Converted to {len(strong_tags_after)} strong tags")
-                    logging.info(f"   Converted to {len(em_tags_after)} em tags")
-                    logging.info(f"   Content after conversion: {content[:200]}...")
+                    logging.info("✅ MARKDOWN CONVERSION COMPLETE:")
+                    logging.info("   Converted to %s strong tags", len(strong_tags_after))
+                    logging.info("   Converted to %s em tags", len(em_tags_after))
+                    logging.info("   Content after conversion: %s...", content[:200])
                 elif not strong_tags and not em_tags:
                     logging.warning("⚠️  NO FORMATTING TAGS OR MARKDOWN FOUND IN ORIGINAL CONTENT!")
                     logging.info("🔍 Checking for alternative formatting indicators...")
@@ -267,7 +331,7 @@ class PDFGenerator:
                     if content.isupper():
                         logging.info("   Content appears to be all uppercase")
                 else:
-                    logging.info(f"✅ Found {len(strong_tags + em_tags)} HTML formatting tags in original content")
+                    logging.info("✅ Found %s HTML formatting tags in original content", len(strong_tags + em_tags))
                 
                 # Replace all variables in the content
                 original_content = content  # Keep original for comparison
@@ -279,19 +343,19 @@ class PDFGenerator:
                 content = content.replace('{Year}', datetime.now().strftime('%Y'))
                 content = content.replace('{Date}', datetime.now().strftime('%Y-%m-%d'))
                 
-                logging.info(f"🔄 AFTER VARIABLE REPLACEMENT:")
-                logging.info(f"   Content changed: {original_content != content}")
-                logging.info(f"   New length: {len(content)} characters")
+                logging.info("🔄 AFTER VARIABLE REPLACEMENT:")
+                logging.info("   Content changed: %s", original_content != content)
+                logging.info("   New length: %s characters", len(content))
                 if original_content != content:
-                    logging.info(f"   First 200 chars after replacement: {content[:200]}...")
+                    logging.info("   First 200 chars after replacement: %s...", content[:200])
                 
                 # Re-check formatting tags after variable replacement
                 strong_tags_after = re.findall(r'</?(?:strong|b)[^>]*>', content, re.IGNORECASE)
                 em_tags_after = re.findall(r'</?(?:em|i)[^>]*>', content, re.IGNORECASE)
                 
-                logging.info(f"🔍 FORMATTING TAGS AFTER VARIABLE REPLACEMENT:")
-                logging.info(f"   Strong/B tags: {len(strong_tags_after)}")
-                logging.info(f"   Em/I tags: {len(em_tags_after)}")
+                logging.info("🔍 FORMATTING TAGS AFTER VARIABLE REPLACEMENT:")
+                logging.info("   Strong/B tags: %s", len(strong_tags_after))
+                logging.info("   Em/I tags: %s", len(em_tags_after))
                 
                 if len(strong_tags_after) == 0 and ('**' in content or '*' in content):
                     logging.warning("⚠️  MARKDOWN FORMATTING DETECTED AFTER VARIABLE REPLACEMENT!")
@@ -304,13 +368,11 @@ class PDFGenerator:
                     # Final check
                     strong_tags_final = re.findall(r'</?(?:strong|b)[^>]*>', content, re.IGNORECASE)
                     em_tags_final = re.findall(r'</?(?:em|i)[^>]*>', content, re.IGNORECASE)
-                    logging.info(f"   Final conversion: {len(strong_tags_final)} strong, {len(em_tags_final)} em tags")
+                    logging.info("   Final conversion: %s strong, %s em tags", len(strong_tags_final), len(em_tags_final))
                 
                 # Parse HTML content and preserve formatting for PDF
-                from html import unescape
-                
-                logging.info(f"🔍 STARTING HTML PROCESSING:")
-                logging.info(f"   Content before processing: {content[:200]}...")
+                logging.info("🔍 STARTING HTML PROCESSING:")
+                logging.info("   Content before processing: %s...", content[:200])
                 
                 # Improved HTML processing to handle streamlit-quill output with inline formatting
                 # Strategy: Preserve formatting tags within content while handling structure
@@ -321,14 +383,14 @@ class PDFGenerator:
                 content = re.sub(r'<li[^>]*>(.*?)</li>', r'• \1\n', content, flags=re.DOTALL)
                 content = re.sub(r'</?(?:ul|ol)[^>]*>', '', content, flags=re.IGNORECASE)
                 if before_lists != content:
-                    logging.info(f"   Lists processed: {before_lists.count('<li')} list items converted")
+                    logging.info("   Lists processed: %s list items converted", before_lists.count('<li'))
                 
                 # Handle line breaks and paragraph spacing - improved approach
                 logging.info("🔄 Processing line breaks and paragraphs...")
                 before_breaks = content
                 content = re.sub(r'<br\s*/?>', '\n', content)
                 if before_breaks != content:
-                    logging.info(f"   Line breaks processed: {before_breaks.count('<br')} <br> tags converted")
+                    logging.info("   Line breaks processed: %s <br> tags converted", before_breaks.count('<br'))
                 
                 # Handle paragraphs while preserving inline formatting
                 # Split on paragraph boundaries but preserve content within paragraphs 
@@ -336,60 +398,60 @@ class PDFGenerator:
                 content = re.sub(r'<p[^>]*>(.*?)</p>', r'\1\n\n', content, flags=re.DOTALL)
                 content = re.sub(r'<div[^>]*>(.*?)</div>', r'\1\n', content, flags=re.DOTALL)
                 if before_paragraphs != content:
-                    logging.info(f"   Paragraphs processed: {before_paragraphs.count('<p')} <p> tags converted")
+                    logging.info("   Paragraphs processed: %s <p> tags converted", before_paragraphs.count('<p'))
                 
                 # Clean up excessive newlines while preserving intentional spacing
                 before_cleanup = content
                 content = re.sub(r'\n{3,}', '\n\n', content)  # Max 2 consecutive newlines
                 content = content.strip()
                 if before_cleanup != content:
-                    logging.info(f"   Newlines cleaned up: excessive newlines removed")
+                    logging.info("   Newlines cleaned up: excessive newlines removed")
                 
                 # CRITICAL: Check formatting tags after HTML processing
                 strong_tags_processed = re.findall(r'</?(?:strong|b)[^>]*>', content, re.IGNORECASE)
                 em_tags_processed = re.findall(r'</?(?:em|i)[^>]*>', content, re.IGNORECASE)
                 
-                logging.info(f"🔍 FORMATTING TAGS AFTER HTML PROCESSING:")
-                logging.info(f"   Strong/B tags: {len(strong_tags_processed)} (was {len(strong_tags_after)})")
-                logging.info(f"   Em/I tags: {len(em_tags_processed)} (was {len(em_tags_after)})")
+                logging.info("🔍 FORMATTING TAGS AFTER HTML PROCESSING:")
+                logging.info("   Strong/B tags: %s (was %s)", len(strong_tags_processed), len(strong_tags_after))
+                logging.info("   Em/I tags: %s (was %s)", len(em_tags_processed), len(em_tags_after))
                 
                 if len(strong_tags_processed) == 0 and len(strong_tags_after) > 0:
                     logging.error("❌ CRITICAL: FORMATTING TAGS LOST DURING HTML PROCESSING!")
-                    logging.info(f"   Before processing: {strong_tags_after}")
-                    logging.info(f"   After processing: {strong_tags_processed}")
+                    logging.info("   Before processing: %s", strong_tags_after)
+                    logging.info("   After processing: %s", strong_tags_processed)
                 
                 # Keep formatting tags intact for the _parse_inline_formatting function
                 
-                logging.info(f"Content after HTML structure processing: {content[:200]}...")
-                logging.info(f"🔍 Checking for formatting tags in processed content...")
+                logging.info("Content after HTML structure processing: %s...", content[:200])
+                logging.info("🔍 Checking for formatting tags in processed content...")
                 
                 # Log formatting tag detection for debugging
                 strong_matches = re.findall(r'</?(?:strong|b)[^>]*>', content, re.IGNORECASE)
                 em_matches = re.findall(r'</?(?:em|i)[^>]*>', content, re.IGNORECASE)
                 
                 if strong_matches:
-                    logging.info(f"✅ Found STRONG/B tags: {strong_matches}")
+                    logging.info("✅ Found STRONG/B tags: %s", strong_matches)
                 if em_matches:
-                    logging.info(f"✅ Found EM/I tags: {em_matches}")
+                    logging.info("✅ Found EM/I tags: %s", em_matches)
                 
                 if not strong_matches and not em_matches:
                     logging.warning("⚠️  No formatting tags found in processed content")
                 else:
-                    logging.info(f"✅ Total formatting tags preserved: {len(strong_matches) + len(em_matches)}")
+                    logging.info("✅ Total formatting tags preserved: %s", len(strong_matches) + len(em_matches))
                 
                 # Now split content by lines to process formatting per line
                 lines = content.split('\n')
-                logging.info(f"🔍 SPLIT INTO LINES:")
-                logging.info(f"   Total lines: {len(lines)}")
-                logging.info(f"   Non-empty lines: {len([l for l in lines if l.strip()])}")
+                logging.info("🔍 SPLIT INTO LINES:")
+                logging.info("   Total lines: %s", len(lines))
+                logging.info("   Non-empty lines: %s", len([l for l in lines if l.strip()]))
                 
                 # Log first few lines for debugging
                 for i, line in enumerate(lines[:5]):
-                    logging.info(f"   Line {i+1}: '{line[:100]}{'...' if len(line) > 100 else ''}'")
+                    logging.info("   Line %s: '%s%s'", i+1, line[:100], '...' if len(line) > 100 else '')
                     if '<strong>' in line.lower() or '<b>' in line.lower():
-                        logging.info(f"     ✅ Line {i+1} contains bold formatting")
+                        logging.info("     ✅ Line %s contains bold formatting", i+1)
                     if '<em>' in line.lower() or '<i>' in line.lower():
-                        logging.info(f"     ✅ Line {i+1} contains italic formatting")
+                        logging.info("     ✅ Line %s contains italic formatting", i+1)
                 
                 # Clean up any problematic characters for PDF but preserve formatting tags
                 for i, line in enumerate(lines):
@@ -407,9 +469,9 @@ class PDFGenerator:
                 # With 2.22-inch left margin (160pt) and reduced right margin (50pt)
                 available_width = 595 - left_margin - right_margin  # About 385 points (~5.35 inches) for content
                 
-                logging.info(f"Processing {len(lines)} lines of content with optimized margins")
-                logging.info(f"OPTIMIZED positioning: left={left_margin}pt (2.22in), top={top_margin}pt ({top_margin/72:.2f}in)")
-                logging.info(f"Available content width: {available_width}pt (~{available_width/72:.2f}in)")
+                logging.info("Processing %s lines of content with optimized margins", len(lines))
+                logging.info("OPTIMIZED positioning: left=%spt (2.22in), top=%spt (%.2fin)", left_margin, top_margin, top_margin/72)
+                logging.info("Available content width: %spt (~%.2fin)", available_width, available_width/72)
                 
                 # Ensure we're positioned correctly
                 self.pdf.set_xy(left_margin, top_margin)
@@ -419,23 +481,23 @@ class PDFGenerator:
                     line = line.strip()
                     if line:
                         # Check for and process formatting in each line
-                        logging.info(f"📝 Processing line {i+1}/{len(lines)}: '{line[:80]}{'...' if len(line) > 80 else ''}'")
+                        logging.info("📝 Processing line %s/%s: '%s%s'", i+1, len(lines), line[:80], '...' if len(line) > 80 else '')
                         if '<strong>' in line.lower() or '<b>' in line.lower():
-                            logging.info(f"   ✅ Line {i+1} has BOLD formatting tags")
+                            logging.info("   ✅ Line %s has BOLD formatting tags", i+1)
                         if '<em>' in line.lower() or '<i>' in line.lower():
-                            logging.info(f"   ✅ Line {i+1} has ITALIC formatting tags")
+                            logging.info("   ✅ Line %s has ITALIC formatting tags", i+1)
                         if not ('<strong>' in line.lower() or '<b>' in line.lower() or '<em>' in line.lower() or '<i>' in line.lower()):
-                            logging.info(f"   ❌ Line {i+1} has NO formatting tags")
+                            logging.info("   ❌ Line %s has NO formatting tags", i+1)
                         
                         self._process_formatted_line(line, available_width)
                     else:
                         # Empty line - add appropriate spacing based on context
-                        logging.info(f"📝 Processing empty line {i+1}/{len(lines)}")
+                        logging.info("📝 Processing empty line %s/%s", i+1, len(lines))
                         self.pdf.ln(8)  # Increased spacing between paragraphs
                 
             else:
                 logging.warning("⚠️  Using legacy structure - 'content' field not found")
-                logging.info(f"Available template fields: {list(template_data.keys())}")
+                logging.info("Available template fields: %s", list(template_data.keys()))
                 # Legacy structure support - fallback to old method
                 # Add custom greeting if provided
                 if 'greeting' in template_data:
@@ -510,9 +572,8 @@ class PDFGenerator:
             
             # Now merge letterhead and content using PyPDF2
             try:
-                # Read letterhead PDF data into memory to avoid file handle issues
-                with open(letterhead_path, 'rb') as letterhead_file:
-                    letterhead_data = letterhead_file.read()
+                # Letterhead PDF data is held in memory to avoid file handle issues
+                letterhead_data = read_letterhead_bytes(letterhead_path)
                 
                 # Create PDF readers from memory buffers
                 letterhead_reader = PyPDF2.PdfReader(io.BytesIO(letterhead_data))
@@ -540,7 +601,7 @@ class PDFGenerator:
                 writer.add_page(final_page)
                 
                 # Generate unique filename
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                timestamp = unique_timestamp(datetime.now())
                 donor_name = f"{donor_info.get('First Name', 'Unknown')}_{donor_info.get('Last Name', 'Donor')}"
                 filename = output_dir / f'NSNA_Receipt_{donor_name}_{timestamp}.pdf'
                 
@@ -548,15 +609,15 @@ class PDFGenerator:
                 with open(filename, 'wb') as output_file:
                     writer.write(output_file)
                 
-                logging.info(f"Successfully generated PDF receipt with letterhead: {filename}")
+                logging.info("Successfully generated PDF receipt with letterhead: %s", filename)
                 return filename
                     
             except Exception as pdf_error:
-                logging.error(f"PDF merging failed: {str(pdf_error)}")
+                logging.error("PDF merging failed: %s", pdf_error)
                 raise pdf_error
 
         except Exception as e:
-            logging.error(f"Failed to generate enhanced PDF with letterhead: {str(e)}")
+            logging.error("Failed to generate enhanced PDF with letterhead: %s", e)
             # Fallback to simple PDF generation
             return self._generate_simple_receipt(donor_info, template_data, output_dir)
 
@@ -570,25 +631,15 @@ class PDFGenerator:
             logging.info("🔧 Using ReportLab for enhanced PDF generation")
             
             # Check for letterhead PDF
-            letterhead_path = None
-            letterhead_paths = [
-                Path(__file__).parent.parent.parent / 'NSNA Atlanta Letterhead Updated.pdf',
-                Path(__file__).parent.parent / 'templates' / 'letterhead_template.pdf',
-                Path(template_data.get('template_path', '')) if template_data.get('template_path') else None
-            ]
-            
-            for path in letterhead_paths:
-                if path and path.exists():
-                    letterhead_path = path
-                    logging.info(f"Found letterhead at: {letterhead_path}")
-                    break
-            
-            if not letterhead_path:
+            letterhead_path = find_first_existing(_letterhead_candidates(template_data))
+            if letterhead_path:
+                logging.info("Found letterhead at: %s", letterhead_path)
+            else:
                 logging.warning("No letterhead PDF found")
                 return self._generate_simple_receipt(donor_info, template_data, output_dir)
             
             # Generate output filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = unique_timestamp(datetime.now())
             donor_name = f"{donor_info.get('First Name', 'Unknown')}_{donor_info.get('Last Name', 'Donor')}"
             temp_content_file = output_dir / f'temp_content_{timestamp}.pdf'
             final_filename = output_dir / f'NSNA_Receipt_ReportLab_{donor_name}_{timestamp}.pdf'
@@ -673,9 +724,8 @@ class PDFGenerator:
             
             # Now merge with letterhead using PyPDF2
             try:
-                # Read letterhead data into memory to avoid file handle issues
-                with open(letterhead_path, 'rb') as letterhead_file:
-                    letterhead_data = letterhead_file.read()
+                # Letterhead data is held in memory to avoid file handle issues
+                letterhead_data = read_letterhead_bytes(letterhead_path)
                 
                 # Read content data into memory
                 with open(temp_content_file, 'rb') as content_file:
@@ -700,26 +750,24 @@ class PDFGenerator:
                     writer.write(output_file)
                 
                 # Clean up temporary file
-                if temp_content_file.exists():
-                    temp_content_file.unlink()
+                temp_content_file.unlink(missing_ok=True)
                 
-                logging.info(f"✅ Successfully generated PDF with ReportLab: {final_filename}")
+                logging.info("✅ Successfully generated PDF with ReportLab: %s", final_filename)
                 
                 if final_filename.exists():
                     file_size = final_filename.stat().st_size
-                    logging.info(f"Generated PDF size: {file_size} bytes")
+                    logging.info("Generated PDF size: %s bytes", file_size)
                 
                 return final_filename
                 
             except Exception as merge_error:
-                logging.error(f"PDF merging failed: {str(merge_error)}")
+                logging.error("PDF merging failed: %s", merge_error)
                 # Clean up temp file
-                if temp_content_file.exists():
-                    temp_content_file.unlink()
+                temp_content_file.unlink(missing_ok=True)
                 raise merge_error
                 
         except Exception as e:
-            logging.error(f"Failed to generate PDF with ReportLab: {str(e)}")
+            logging.error("Failed to generate PDF with ReportLab: %s", e)
             return self.generate_enhanced_receipt_pypdf2(donor_info, template_data, output_dir)
 
     def generate_html_pdf_reportlab(self, donor_info, template_data, output_dir):
@@ -730,19 +778,18 @@ class PDFGenerator:
                 return self._generate_simple_receipt(donor_info, template_data, output_dir)
             
             from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
             from reportlab.lib.units import inch
             from reportlab.lib.pagesizes import letter
             from reportlab.platypus.frames import Frame
             from reportlab.platypus.doctemplate import PageTemplate
-            import tempfile
             
             logging.info("🎨 Using ReportLab HTML rendering - no regex parsing required!")
             
             # Create output filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            now = datetime.now()
+            timestamp = unique_timestamp(now)
             safe_name = f"{donor_info.get('First Name', 'Unknown')}_{donor_info.get('Last Name', 'Donor')}"
-            safe_name = "".join(c for c in safe_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
+            safe_name = UNSAFE_FILENAME_CHARS.sub('', safe_name).rstrip()
             filename = f"NSNA_Receipt_{safe_name}_{timestamp}.pdf"
             
             output_path = Path(output_dir) / filename
@@ -750,14 +797,14 @@ class PDFGenerator:
             # Get HTML content
             html_content = template_data.get('content', '<p>No content provided</p>')
             
-            logging.info(f"📄 Processing HTML content length: {len(html_content)}")
-            logging.info(f"📄 Content preview: {html_content[:200]}...")
+            logging.info("📄 Processing HTML content length: %s", len(html_content))
+            logging.info("📄 Content preview: %s...", html_content[:200])
             
             # Log the full content for debugging
             if len(html_content) < 1000:
-                logging.info(f"📄 Full content: {html_content}")
+                logging.info("📄 Full content: %s", html_content)
             else:
-                logging.info(f"📄 Content too long, showing first 500 chars: {html_content[:500]}...")
+                logging.info("📄 Content too long, showing first 500 chars: %s...", html_content[:500])
             
             # MARKDOWN TO HTML CONVERSION for ReportLab method
             if '**' in html_content or '*' in html_content:
@@ -769,24 +816,33 @@ class PDFGenerator:
                 html_content = re.sub(r'(?<!\*)\*([^*]+)\*(?!\*)', r'<em>\1</em>', html_content)
                 
                 if original_content != html_content:
-                    logging.info(f"✅ Markdown converted to HTML for ReportLab")
-                    logging.info(f"   Content after conversion: {html_content[:200]}...")
+                    logging.info("✅ Markdown converted to HTML for ReportLab")
+                    logging.info("   Content after conversion: %s...", html_content[:200])
                 else:
                     logging.info("   No markdown conversion needed")
             
-            # Replace variables in the content
-            logging.info(f"🔄 Replacing variables in content...")
-            for key, value in donor_info.items():
-                old_content = html_content
-                html_content = html_content.replace(f"{{{key}}}", str(value))
-                if old_content != html_content:
-                    logging.info(f"   Replaced {{{key}}} with {value}")
+            # Replace variables in the content in a single pass; donor fields win over the defaults
+            logging.info("🔄 Replacing variables in content...")
+            values = {
+                'Amount': donor_info.get('Donation Amount', '0.00'),
+                'Year': now.strftime('%Y'),
+                'Date': now.strftime('%Y-%m-%d'),
+                **donor_info
+            }
+            
+            replaced = []
             
-            html_content = html_content.replace('{Amount}', str(donor_info.get('Donation Amount', '0.00')))
-            html_content = html_content.replace('{Year}', datetime.now().strftime('%Y'))
-            html_content = html_content.replace('{Date}', datetime.now().strftime('%Y-%m-%d'))
+            def lookup(match):
+                name = match.group(1)
+                if name not in values:
+                    return match.group(0)
+                replaced.append(name)
+                return str(values[name])
             
-            logging.info(f"📄 Final content after variable replacement: {html_content[:200]}...")
+            html_content = TEMPLATE_VARIABLE_PATTERN.sub(lookup, html_content)
+            logging.debug("   Replaced variables: %s", replaced)
+            
+            logging.info("📄 Final content after variable replacement: %s...", html_content[:200])
             
             # Create PDF document with improved positioning to avoid letterhead overlap
             doc = SimpleDocTemplate(
@@ -798,30 +854,15 @@ class PDFGenerator:
                 bottomMargin=1.0*inch    # Bottom margin
             )
             
-            logging.info(f"📏 PDF margins set - Top: 1.5in, Left: 2.0in, Right: 0.75in, Bottom: 1.0in")
-            
-            # Get styles and create improved custom style
-            styles = getSampleStyleSheet()
+            logging.info("📏 PDF margins set - Top: 1.5in, Left: 2.0in, Right: 0.75in, Bottom: 1.0in")
             
-            # Create custom style that handles HTML properly with normal spacing
-            normal_style = ParagraphStyle(
-                'CustomNormal',
-                parent=styles['Normal'],
-                fontName='Helvetica',
-                fontSize=11,
-                leading=13,              # Normal line spacing (1.2x font size)
-                spaceAfter=4,            # Minimal space after paragraphs
-                spaceBefore=0,           # No space before paragraphs
-                allowWidows=1,
-                allowOrphans=1,
-                wordWrap='CJK'           # Better word wrapping
-            )
+            normal_style = _html_paragraph_style()
             
             # Build the story (content)
             story = []
             
             # Enhanced paragraph processing for better HTML formatting support
-            logging.info(f"🔄 Processing HTML content for ReportLab paragraphs...")
+            logging.info("🔄 Processing HTML content for ReportLab paragraphs...")
             
             # Import BeautifulSoup for proper HTML parsing if available
             try:
@@ -852,18 +893,18 @@ class PDFGenerator:
                         element_html = element_html.replace('<div>', '').replace('</div>', '')
                         
                         if element_html.strip():
-                            logging.info(f"     Processing element: {element_html[:50]}{'...' if len(element_html) > 50 else ''}")
+                            logging.info("     Processing element: %s%s", element_html[:50], '...' if len(element_html) > 50 else '')
                             
                             # Check for formatting
                             has_formatting = any(tag in element_html for tag in ['<strong>', '<b>', '<em>', '<i>', '<u>'])
-                            logging.info(f"       Has HTML formatting: {has_formatting}")
+                            logging.info("       Has HTML formatting: %s", has_formatting)
                             
                             # ReportLab Paragraph handles HTML tags directly
                             try:
                                 story.append(Paragraph(element_html, normal_style))
                                 story.append(Spacer(1, 2))
                             except Exception as para_error:
-                                logging.warning(f"       Failed to create paragraph: {para_error}")
+                                logging.warning("       Failed to create paragraph: %s", para_error)
                                 # Fallback: strip tags and use plain text
                                 plain_text = element.get_text()
                                 story.append(Paragraph(plain_text, normal_style))
@@ -887,16 +928,16 @@ class PDFGenerator:
                 if '<p>' not in content_to_process and '<div>' not in content_to_process:
                     # Split by double newlines to create paragraphs
                     paragraphs = content_to_process.split('\n\n')
-                    logging.info(f"   Split into {len(paragraphs)} paragraphs by double newlines")
+                    logging.info("   Split into %s paragraphs by double newlines", len(paragraphs))
                     
                     for i, para in enumerate(paragraphs):
                         para = para.strip().replace('\n', '<br/>')  # Convert single newlines to HTML breaks
                         if para:
-                            logging.info(f"     Paragraph {i+1}: {para[:50]}{'...' if len(para) > 50 else ''}")
+                            logging.info("     Paragraph %s: %s%s", i+1, para[:50], '...' if len(para) > 50 else '')
                             
                             # Check if paragraph has formatting
                             has_formatting = any(tag in para for tag in ['<strong>', '<b>', '<em>', '<i>', '<u>', '**'])
-                            logging.info(f"       Has HTML formatting: {has_formatting}")
+                            logging.info("       Has HTML formatting: %s", has_formatting)
                             
                             # Convert any remaining markdown to HTML
                             para = re.sub(r'\*\*([^*]+)\*\*', r'<strong>\1</strong>', para)
@@ -907,7 +948,7 @@ class PDFGenerator:
                                 story.append(Paragraph(para, normal_style))
                                 story.append(Spacer(1, 2))  # Minimal spacing between paragraphs
                             except Exception as para_error:
-                                logging.warning(f"       Failed to create paragraph: {para_error}")
+                                logging.warning("       Failed to create paragraph: %s", para_error)
                                 # Strip HTML and use plain text
                                 plain_text = re.sub(r'<[^>]+>', '', para)
                                 story.append(Paragraph(plain_text, normal_style))
@@ -915,30 +956,28 @@ class PDFGenerator:
                 else:
                     # HTML content with block-level tags
                     # Split by paragraph or div tags
-                    import re
-                    
                     # Extract content between paragraph tags
                     para_pattern = r'<(?:p|div)[^>]*>(.*?)</(?:p|div)>'
                     matches = re.findall(para_pattern, content_to_process, re.DOTALL | re.IGNORECASE)
                     
                     if matches:
-                        logging.info(f"   Found {len(matches)} HTML block elements")
+                        logging.info("   Found %s HTML block elements", len(matches))
                         
                         for i, para in enumerate(matches):
                             para = para.strip()
                             if para:
-                                logging.info(f"     Paragraph {i+1}: {para[:50]}{'...' if len(para) > 50 else ''}")
+                                logging.info("     Paragraph %s: %s%s", i+1, para[:50], '...' if len(para) > 50 else '')
                                 
                                 # Check if paragraph has formatting
                                 has_formatting = any(tag in para for tag in ['<strong>', '<b>', '<em>', '<i>', '<u>'])
-                                logging.info(f"       Has HTML formatting: {has_formatting}")
+                                logging.info("       Has HTML formatting: %s", has_formatting)
                                 
                                 # ReportLab Paragraph can handle basic HTML tags!
                                 try:
                                     story.append(Paragraph(para, normal_style))
                                     story.append(Spacer(1, 2))
                                 except Exception as para_error:
-                                    logging.warning(f"       Failed to create paragraph: {para_error}")
+                                    logging.warning("       Failed to create paragraph: %s", para_error)
                                     # Strip HTML and use plain text
                                     plain_text = re.sub(r'<[^>]+>', '', para)
                                     story.append(Paragraph(plain_text, normal_style))
@@ -954,63 +993,63 @@ class PDFGenerator:
                                 story.append(Spacer(1, 2))
             
             # Log final story summary
-            logging.info(f"📊 Final story contains {len(story)} elements")
+            logging.info("📊 Final story contains %s elements", len(story))
             paragraph_count = len([item for item in story if hasattr(item, 'text')])
             spacer_count = len(story) - paragraph_count
-            logging.info(f"   - {paragraph_count} paragraphs")
-            logging.info(f"   - {spacer_count} spacers")
+            logging.info("   - %s paragraphs", paragraph_count)
+            logging.info("   - %s spacers", spacer_count)
             
             # Build PDF
             logging.info("🔨 Building PDF document...")
             doc.build(story)
-            logging.info(f"✅ PDF document built successfully: {output_path}")
+            logging.info("✅ PDF document built successfully: %s", output_path)
             
             # Check file size
             if output_path.exists():
                 file_size = output_path.stat().st_size
-                logging.info(f"📁 Generated PDF size: {file_size} bytes")
+                logging.info("📁 Generated PDF size: %s bytes", file_size)
             else:
                 logging.error("❌ PDF file was not created!")
                 return None
             
             # IMPORTANT: Always overlay letterhead if template_path is provided
-            # Get the root directory of the project (go up from src/utils/ to root)
-            project_root = Path(__file__).parent.parent.parent
-            print(f"🔍 LETTERHEAD DEBUG: Project root: {project_root}")
-            
-            letterhead_paths = [
-                project_root / 'NSNA Atlanta Letterhead Updated.pdf',  # Root directory
-                project_root / 'src' / 'templates' / 'letterhead_template.pdf',  # Templates directory
-                Path(template_data.get('template_path', '')) if template_data.get('template_path') else None  # Explicit path from template
-            ]
+            project_root = PROJECT_ROOT
+            letterhead_paths = _letterhead_candidates(template_data)
             
-            print(f"🔍 LETTERHEAD DEBUG: Searching for letterhead...")
-            print(f"🔍 LETTERHEAD DEBUG: Search paths:")
+            # Collect the debug report and print it in one write; a single
+            # stat per candidate gives existence and size, and the first hit
+            # is the letterhead, so the directories are not scanned again
+            letterhead_path = None
+            debug_lines = [
+                f"🔍 LETTERHEAD DEBUG: Project root: {project_root}",
+                "🔍 LETTERHEAD DEBUG: Searching for letterhead...",
+                "🔍 LETTERHEAD DEBUG: Search paths:",
+            ]
             for i, path in enumerate(letterhead_paths):
                 if path:
-                    abs_path = path.absolute()
-                    exists = path.exists()
-                    print(f"   {i+1}. {abs_path} (exists: {exists})")
-                    if exists:
+                    try:
                         size = path.stat().st_size
-                        print(f"       Size: {size} bytes")
+                    except OSError:
+                        size = None
+                    debug_lines.append(f"   {i+1}. {path.absolute()} (exists: {size is not None})")
+                    if size is not None:
+                        debug_lines.append(f"       Size: {size} bytes")
+                        if letterhead_path is None:
+                            letterhead_path = path
                 else:
-                    print(f"   {i+1}. None")
+                    debug_lines.append(f"   {i+1}. None")
             
-            letterhead_path = None
-            for path in letterhead_paths:
-                if path and path.exists():
-                    letterhead_path = path
-                    print(f"✅ LETTERHEAD DEBUG: Found letterhead for overlay: {letterhead_path}")
-                    logging.info(f"Found letterhead for overlay: {letterhead_path}")
-                    break
+            if letterhead_path:
+                debug_lines.append(f"✅ LETTERHEAD DEBUG: Found letterhead for overlay: {letterhead_path}")
+            print("\n".join(debug_lines))
             
             if letterhead_path:
+                logging.info("Found letterhead for overlay: %s", letterhead_path)
                 print(f"🎨 LETTERHEAD DEBUG: Overlaying content PDF onto letterhead: {letterhead_path}")
-                logging.info(f"🎨 Overlaying content PDF onto letterhead: {letterhead_path}")
+                logging.info("🎨 Overlaying content PDF onto letterhead: %s", letterhead_path)
                 output_path = self._overlay_letterhead_reportlab(output_path, letterhead_path)
                 print(f"✅ LETTERHEAD DEBUG: Letterhead overlay complete: {output_path}")
-                logging.info(f"✅ Letterhead overlay complete: {output_path}")
+                logging.info("✅ Letterhead overlay complete: %s", output_path)
             else:
                 print(f"⚠️ LETTERHEAD DEBUG: No letterhead found - PDF will be plain content only")
                 logging.warning("⚠️ No letterhead found - PDF will be plain content only")
@@ -1023,26 +1062,24 @@ class PDFGenerator:
                 except Exception as list_error:
                     print(f"     Error listing files: {list_error}")
             
-            logging.info(f"✅ PDF generated successfully using ReportLab HTML: {output_path}")
+            logging.info("✅ PDF generated successfully using ReportLab HTML: %s", output_path)
             return str(output_path)
             
         except Exception as e:
-            logging.error(f"❌ ReportLab HTML generation failed: {str(e)}")
+            logging.error("❌ ReportLab HTML generation failed: %s", str(e))
             # Fallback to existing method
             return self.generate_enhanced_receipt_pypdf2(donor_info, template_data, output_dir)
     
     def _overlay_letterhead_reportlab(self, content_pdf_path, letterhead_path):
         """Overlay content PDF onto letterhead using PyPDF2"""
         try:
-            import PyPDF2
-            
             print(f"🔗 OVERLAY DEBUG: Starting letterhead overlay process...")
             print(f"📄 OVERLAY DEBUG: Content PDF: {content_pdf_path}")
             print(f"🏢 OVERLAY DEBUG: Letterhead PDF: {letterhead_path}")
             
-            logging.info(f"🔗 Starting letterhead overlay process...")
-            logging.info(f"📄 Content PDF: {content_pdf_path}")
-            logging.info(f"🏢 Letterhead PDF: {letterhead_path}")
+            logging.info("🔗 Starting letterhead overlay process...")
+            logging.info("📄 Content PDF: %s", content_pdf_path)
+            logging.info("🏢 Letterhead PDF: %s", letterhead_path)
             
             # Verify both files exist
             if not Path(content_pdf_path).exists():
@@ -1066,16 +1103,15 @@ class PDFGenerator:
             letterhead_page = None
             content_page = None
             
-            # Read the letterhead PDF first and keep the page in memory
-            with open(letterhead_path, 'rb') as letterhead_file:
-                letterhead_data = letterhead_file.read()
+            # Load the letterhead PDF first and keep the page in memory
+            letterhead_data = read_letterhead_bytes(letterhead_path)
             
             letterhead_reader = PyPDF2.PdfReader(io.BytesIO(letterhead_data))
             if len(letterhead_reader.pages) == 0:
                 raise Exception("Letterhead PDF has no pages")
             letterhead_page = letterhead_reader.pages[0]
             print(f"✅ OVERLAY DEBUG: Letterhead page loaded successfully")
-            logging.info(f"✅ Letterhead page loaded successfully")
+            logging.info("✅ Letterhead page loaded successfully")
             
             # Read the content PDF and keep the page in memory
             with open(content_pdf_path, 'rb') as content_file:
@@ -1086,12 +1122,12 @@ class PDFGenerator:
                 raise Exception("Content PDF has no pages")
             content_page = content_reader.pages[0]
             print(f"✅ OVERLAY DEBUG: Content page loaded successfully")
-            logging.info(f"✅ Content page loaded successfully")
+            logging.info("✅ Content page loaded successfully")
             
             # Merge content onto letterhead (letterhead is background, content overlays)
             letterhead_page.merge_page(content_page)
             print(f"✅ OVERLAY DEBUG: Pages merged successfully")
-            logging.info(f"✅ Pages merged successfully")
+            logging.info("✅ Pages merged successfully")
             
             # Write the result
             with open(output_path, 'wb') as output_file:
@@ -1100,19 +1136,19 @@ class PDFGenerator:
                 writer.write(output_file)
             
             print(f"✅ OVERLAY DEBUG: Final PDF written: {output_path}")
-            logging.info(f"✅ Final PDF written: {output_path}")
+            logging.info("✅ Final PDF written: %s", output_path)
             
             # Verify the output file was created and has content
             if output_path.exists():
                 file_size = output_path.stat().st_size
                 print(f"✅ OVERLAY DEBUG: Output file size: {file_size} bytes")
-                logging.info(f"✅ Output file size: {file_size} bytes")
+                logging.info("✅ Output file size: %s bytes", file_size)
                 
                 # Clean up original content PDF (keep only the final version)
                 try:
                     Path(content_pdf_path).unlink(missing_ok=True)
                     print(f"🗑️ OVERLAY DEBUG: Cleaned up temporary content PDF")
-                    logging.info(f"🗑️ Cleaned up temporary content PDF")
+                    logging.info("🗑️ Cleaned up temporary content PDF")
                 except:
                     pass  # Don't fail if cleanup fails
                 
@@ -1122,9 +1158,9 @@ class PDFGenerator:
             
         except Exception as e:
             print(f"❌ OVERLAY DEBUG: Failed to overlay letterhead: {e}")
-            logging.error(f"❌ Failed to overlay letterhead: {e}")
+            logging.error("❌ Failed to overlay letterhead: %s", e)
             print(f"📄 OVERLAY DEBUG: Returning original content PDF: {content_pdf_path}")
-            logging.info(f"📄 Returning original content PDF: {content_pdf_path}")
+            logging.info("📄 Returning original content PDF: %s", content_pdf_path)
             return str(content_pdf_path)  # Return original if overlay fails
 
     def _generate_simple_receipt(self, donor_info, template_data, output_dir):
@@ -1185,23 +1221,20 @@ class PDFGenerator:
             self.pdf.multi_cell(0, 6, 'This letter serves as your official receipt for tax purposes.')
             
             # Generate filename and save
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = unique_timestamp(datetime.now())
             filename = output_dir / f'receipt_{donor_info["First Name"]}_{donor_info["Last Name"]}_{timestamp}.pdf'
             
             self.pdf.output(str(filename))
-            logging.info(f"Generated simple PDF receipt: {filename}")
+            logging.info("Generated simple PDF receipt: %s", filename)
             
             return filename
             
         except Exception as e:
-            logging.error(f"Failed to generate simple PDF: {str(e)}")
+            logging.error("Failed to generate simple PDF: %s", e)
             raise
 
     def _process_formatted_line(self, line, available_width):
         """Process a line of text with HTML formatting and render to PDF"""
-        import re
-        from html import unescape
-        
         try:
             # Clean up the line first
             clean_line = line.strip()
@@ -1211,22 +1244,22 @@ class PDFGenerator:
             
             # Save original line for better formatting detection
             original_line = clean_line
-            logging.info(f"🔍 _process_formatted_line called with: '{original_line[:100]}{'...' if len(original_line) > 100 else ''}'")
+            logging.info("🔍 _process_formatted_line called with: '%s%s'", original_line[:100], '...' if len(original_line) > 100 else '')
             
             # Check for formatting tags in original line
             has_strong = '<strong>' in original_line.lower() or '<b>' in original_line.lower()
             has_em = '<em>' in original_line.lower() or '<i>' in original_line.lower()
-            logging.info(f"   Original line formatting check: BOLD={has_strong}, ITALIC={has_em}")
+            logging.info("   Original line formatting check: BOLD=%s, ITALIC=%s", has_strong, has_em)
             
             # NEW APPROACH: Process inline formatting by splitting text into segments
             # This handles cases like: "No goods or <strong>services</strong> were provided"
             
             # Find all formatting segments in the line
             segments = self._parse_inline_formatting(original_line)
-            logging.info(f"   Parsed into {len(segments)} segments")
+            logging.info("   Parsed into %s segments", len(segments))
             
             if segments:
-                logging.info(f"   ✅ Using segment-based formatting approach")
+                logging.info("   ✅ Using segment-based formatting approach")
                 # Process each segment with its formatting
                 current_y = self.pdf.get_y()
                 x_position = self.pdf.get_x()
@@ -1236,7 +1269,7 @@ class PDFGenerator:
                     is_bold = segment['bold']
                     is_italic = segment['italic']
                     
-                    logging.info(f"     Segment {j+1}: '{text[:30]}{'...' if len(text) > 30 else ''}' BOLD={is_bold} ITALIC={is_italic}")
+                    logging.info("     Segment %s: '%s%s' BOLD=%s ITALIC=%s", j+1, text[:30], '...' if len(text) > 30 else '', is_bold, is_italic)
                     
                     if not text.strip():
                         continue
@@ -1244,23 +1277,23 @@ class PDFGenerator:
                     # Apply formatting based on segment
                     if is_bold and is_italic:
                         self.pdf.set_font('Arial', 'BI', 11)
-                        logging.info(f"       ✅ Applied BOLD+ITALIC font to: '{text[:20]}...'")
+                        logging.info("       ✅ Applied BOLD+ITALIC font to: '%s...'", text[:20])
                     elif is_bold:
                         self.pdf.set_font('Arial', 'B', 11)
-                        logging.info(f"       ✅ Applied BOLD font to: '{text[:20]}...'")
+                        logging.info("       ✅ Applied BOLD font to: '%s...'", text[:20])
                     elif is_italic:
                         self.pdf.set_font('Arial', 'I', 11)
-                        logging.info(f"       ✅ Applied ITALIC font to: '{text[:20]}...'")
+                        logging.info("       ✅ Applied ITALIC font to: '%s...'", text[:20])
                     else:
                         self.pdf.set_font('Arial', '', 11)
-                        logging.info(f"       📝 Applied REGULAR font to: '{text[:20]}...'")
+                        logging.info("       📝 Applied REGULAR font to: '%s...'", text[:20])
                     
                     # Verify font was set correctly
                     current_font = getattr(self.pdf, 'current_font', {})
                     if hasattr(self.pdf, 'current_font'):
-                        logging.info(f"       🔧 Current PDF font: {current_font.get('family', 'unknown')} {current_font.get('style', 'unknown')}")
+                        logging.info("       🔧 Current PDF font: %s %s", current_font.get('family', 'unknown'), current_font.get('style', 'unknown'))
                     else:
-                        logging.info(f"       ⚠️  Could not verify current PDF font")
+                        logging.info("       ⚠️  Could not verify current PDF font")
                     
                     # Calculate text width and render
                     text_width = self.pdf.get_string_width(text)
@@ -1300,14 +1333,14 @@ class PDFGenerator:
                 
                 # Apply default formatting
                 self.pdf.set_font('Arial', '', 11)
-                logging.info(f"📝 Fallback - Regular text: {clean_line[:50]}...")
+                logging.info("📝 Fallback - Regular text: %s...", clean_line[:50])
                 
                 # Render the line with specified width for consistent positioning
                 self.pdf.multi_cell(available_width, 6, clean_line, ln=1)  # Increased line height
                 self.pdf.ln(2)  # Consistent spacing
             
         except Exception as e:
-            logging.error(f"❌ Error processing formatted line: {str(e)}")
+            logging.error("❌ Error processing formatted line: %s", e)
             # Fallback: render as plain text
             fallback_text = re.sub(r'<[^>]+>', '', line)
             fallback_text = unescape(fallback_text) if fallback_text else line
@@ -1318,9 +1351,6 @@ class PDFGenerator:
 
     def _parse_inline_formatting(self, html_text):
         """Parse HTML text into segments with formatting information - ENHANCED VERSION"""
-        import re
-        from html import unescape
-        
         try:
             # Clean up the input but preserve formatting tags
             text = html_text.strip()
@@ -1328,7 +1358,7 @@ class PDFGenerator:
             if not text:
                 return []
             
-            logging.info(f"🔍 ENHANCED parsing HTML: {text[:100]}{'...' if len(text) > 100 else ''}")
+            logging.info("🔍 ENHANCED parsing HTML: %s%s", text[:100], '...' if len(text) > 100 else '')
             
             # Pre-process to normalize formatting tags
             original_text = text
@@ -1340,14 +1370,14 @@ class PDFGenerator:
             text = re.sub(r'</i>', '</em>', text, flags=re.IGNORECASE)
             
             if original_text != text:
-                logging.info(f"🔧 Normalized HTML: {text[:100]}{'...' if len(text) > 100 else ''}")
+                logging.info("🔧 Normalized HTML: %s%s", text[:100], '...' if len(text) > 100 else '')
             else:
-                logging.info(f"🔧 No normalization needed")
+                logging.info("🔧 No normalization needed")
             
             # Count formatting tags after normalization
             strong_count = text.lower().count('<strong>') + text.lower().count('</strong>')
             em_count = text.lower().count('<em>') + text.lower().count('</em>')
-            logging.info(f"   Formatting tag count: {strong_count} strong tags, {em_count} em tags")
+            logging.info("   Formatting tag count: %s strong tags, %s em tags", strong_count, em_count)
             
             segments = []
             
@@ -1386,7 +1416,7 @@ class PDFGenerator:
                             'bold': is_bold,
                             'italic': is_italic
                         })
-                        logging.info(f"📝 Added segment: '{clean_text[:30]}...' Bold:{is_bold} Italic:{is_italic}")
+                        logging.info("📝 Added segment: '%s...' Bold:%s Italic:%s", clean_text[:30], is_bold, is_italic)
             
             if not segments:
                 # Fallback: treat entire text as unformatted if no tags found
@@ -1398,13 +1428,13 @@ class PDFGenerator:
                         'bold': False,
                         'italic': False
                     })
-                    logging.info(f"📝 Fallback segment: '{clean_text[:30]}...'")
+                    logging.info("📝 Fallback segment: '%s...'", clean_text[:30])
             
-            logging.info(f"✅ Total segments parsed: {len(segments)}")
+            logging.info("✅ Total segments parsed: %s", len(segments))
             return segments
             
         except Exception as e:
-            logging.error(f"❌ Error in enhanced HTML parsing: {str(e)}")
+            logging.error("❌ Error in enhanced HTML parsing: %s", e)
             # Ultimate fallback
             clean_text = re.sub(r'<[^>]+>', '', html_text)
             clean_text = unescape(clean_text).strip()
@@ -8,6 +8,9 @@ from datetime import datetime
 from typing import List, Dict, Any
 import re
 
+# Template variables look like {First Name}
+VARIABLE_PATTERN = re.compile(r'\{([^}]+)\}')
+
 def create_rich_text_editor(content: str, available_variables: List[str], key: str = "rich_editor") -> str:
     """
     Create a Word-like rich text editor with intuitive formatting and proper variable insertion
@@ -198,13 +201,13 @@ def create_rich_text_editor(content: str, available_variables: List[str], key: s
         """, unsafe_allow_html=True)
         
         # Variable validation
-        variables_used = re.findall(r'\{([^}]+)\}', edited_content)
+        variables_used = VARIABLE_PATTERN.findall(edited_content)
         if variables_used:
             st.markdown("**🔍 Variables Used:**")
             valid_vars = []
             invalid_vars = []
             
-            for var in set(variables_used):
+            for var in dict.fromkeys(variables_used):
                 if var in available_variables:
                     valid_vars.append(var)
                 else:
@@ -267,210 +270,6 @@ def create_template_formatting_options() -> Dict[str, Any]:
         'line_spacing': line_spacing
     }
 
-def apply_formatting_to_html(content: str, formatting: Dict[str, Any]) -> str:
-    """
-    Apply formatting options to HTML content
-    """
-    # Convert markdown-style formatting to HTML
-    html_content = content
-    
-    # Apply basic formatting
-    html_content = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', html_content)
-    html_content = re.sub(r'\*(.*?)\*', r'<em>\1</em>', html_content)
-    html_content = re.sub(r'<u>(.*?)</u>', r'<u>\1</u>', html_content)
-    
-    # Handle bullet points
-    html_content = re.sub(r'^• (.+)$', r'<li>\1</li>', html_content, flags=re.MULTILINE)
-    html_content = re.sub(r'^- (.+)$', r'<li>\1</li>', html_content, flags=re.MULTILINE)
-    
-    # Handle numbered lists
-    html_content = re.sub(r'^\d+\. (.+)$', r'<li>\1</li>', html_content, flags=re.MULTILINE)
-    
-    # Wrap consecutive list items in ul tags
-    html_content = re.sub(r'(<li>.*?</li>(\s*<li>.*?</li>)*)', r'<ul>\1</ul>', html_content, flags=re.DOTALL)
-    
-    # Create full HTML with styling
-    formatted_html = f"""
-    <html>
-    <body style="
-        font-family: {formatting['font_family']}, sans-serif; 
-        line-height: {formatting['line_spacing']}; 
-        color: {formatting['text_color']};
-        font-size: {formatting['font_size']};
-        max-width: 600px;
-        margin: 0 auto;
-        padding: 20px;
-    ">
-        <div>
-            {html_content.replace(chr(10), '<br>')}
-        </div>
-    </body>
-    </html>
-    """
-    return formatted_html
-
-def create_variable_helper(available_variables: List[str]) -> None:
-    """
-    Create a helpful display of available variables organized by category
-    """
-    if not available_variables:
-        st.info("📋 No variables available. Upload Excel data first to see available variables.")
-        return
-    
-    st.markdown("**📋 Available Variables from Your Excel Data**")
-    
-    # Organize variables by category
-    personal_vars = []
-    financial_vars = []
-    date_vars = []
-    other_vars = []
-    
-    for var in available_variables:
-        var_lower = var.lower()
-        if any(keyword in var_lower for keyword in ['name', 'first', 'last', 'email', 'phone']):
-            personal_vars.append(var)
-        elif any(keyword in var_lower for keyword in ['amount', 'donation', 'total', 'sum', 'payment', 'price', 'cost']):
-            financial_vars.append(var)
-        elif any(keyword in var_lower for keyword in ['date', 'year', 'time', 'month', 'day']):
-            date_vars.append(var)
-        else:
-            other_vars.append(var)
-    
-    # Display in organized columns
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        if personal_vars:
-            st.markdown("**👤 Personal Info:**")
-            for var in personal_vars:
-                st.code(f"{{{var}}}", language=None)
-    
-    with col2:
-        if financial_vars:
-            st.markdown("**💰 Financial:**")
-            for var in financial_vars:
-                st.code(f"{{{var}}}", language=None)
-    
-    with col3:
-        if date_vars:
-            st.markdown("**📅 Dates:**")
-            for var in date_vars:
-                st.code(f"{{{var}}}", language=None)
-    
-    with col4:
-        if other_vars:
-            st.markdown("**📊 Other:**")
-            for var in other_vars[:8]:  # Limit to 8 to avoid clutter
-                st.code(f"{{{var}}}", language=None)
-            if len(other_vars) > 8:
-                st.caption(f"... and {len(other_vars) - 8} more")
-
-def create_email_template_presets() -> Dict[str, str]:
-    """
-    Create preset email templates for common use cases
-    """
-    presets = {
-        "Donation Receipt": """Dear {First Name} {Last Name},
-
-**Thank you for your generous donation to the Nagarathar Sangam of North America.**
-
-We are pleased to acknowledge your contribution of **${Amount}** received on **{Date}**.
-
-Your support helps us:
-• Preserve our cultural heritage
-• Support community programs  
-• Maintain our traditional values
-• Strengthen our community bonds
-
-This letter serves as your official receipt for tax purposes.
-
-Best regards,
-
-NSNA Treasurer
-Nagarathar Sangam of North America
-Email: treasurer@nsna.org""",
-        
-        "Event Thank You": """Dear {First Name} {Last Name},
-
-**Thank you for attending our recent NSNA event!**
-
-Your participation and support mean the world to our community.
-
-We hope you enjoyed:
-• The cultural presentations
-• Networking with fellow members
-• The delicious traditional food
-• The meaningful conversations
-
-We look forward to seeing you at future gatherings.
-
-With warm regards,
-
-NSNA Event Committee""",
-        
-        "Membership Welcome": """Dear {First Name} {Last Name},
-
-**Welcome to the Nagarathar Sangam of North America!**
-
-We are delighted to have you as a member of our vibrant community.
-
-As a member, you'll enjoy:
-• Access to all NSNA events
-• Cultural preservation programs
-• Networking opportunities
-• Community support services
-
-Your membership helps us preserve our traditions and strengthen our bonds as a community.
-
-We look forward to your active participation in our activities and events.
-
-Best regards,
-
-NSNA Membership Committee""",
-        
-        "Custom Template": ""
-    }
-    
-    return presets
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        font_family = st.selectbox(
-            "Font Family",
-            ["Arial", "Georgia", "Times New Roman", "Helvetica", "Verdana"],
-            index=0
-        )
-        
-        font_size = st.selectbox(
-            "Font Size",
-            ["12px", "14px", "16px", "18px", "20px"],
-            index=1
-        )
-    
-    with col2:
-        text_color = st.selectbox(
-            "Text Color",
-            ["#333333 (Dark Gray)", "#000000 (Black)", "#2E4BC6 (Blue)", "#C62E2E (Red)", "#2E8B57 (Green)"],
-            index=0
-        )
-        
-        line_spacing = st.selectbox(
-            "Line Spacing",
-            ["1.4", "1.6", "1.8", "2.0"],
-            index=1
-        )
-    
-    # Extract color code
-    color_code = text_color.split(" ")[0]
-    
-    return {
-        'font_family': font_family,
-        'font_size': font_size,
-        'text_color': color_code,
-        'line_spacing': line_spacing
-    }
-
 def apply_formatting_to_html(content: str, formatting: Dict[str, Any]) -> str:
     """
     Apply formatting options to HTML content
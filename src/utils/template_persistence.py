@@ -3,12 +3,13 @@ Template persistence manager for NSNA Mail Merge Tool
 Handles saving and loading of email and PDF templates
 """
 
-import json
 import os
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+from utils.json_store import read_json, write_json_atomic
+
 class TemplatePersistence:
     """Manages saving and loading of email and PDF templates"""
     
@@ -28,8 +29,7 @@ class TemplatePersistence:
             template_data['last_saved'] = datetime.now().isoformat()
             template_data['version'] = '1.0'
             
-            with open(self.email_template_file, 'w', encoding='utf-8') as f:
-                json.dump(template_data, f, indent=2, ensure_ascii=False)
+            write_json_atomic(self.email_template_file, template_data)
             
             return True
         except Exception as e:
@@ -39,10 +39,7 @@ class TemplatePersistence:
     def load_email_template(self) -> Optional[Dict[str, Any]]:
         """Load email template from disk"""
         try:
-            if self.email_template_file.exists():
-                with open(self.email_template_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return None
+            return read_json(self.email_template_file)
         except Exception as e:
             print(f"Error loading email template: {e}")
             return None
@@ -53,8 +50,7 @@ class TemplatePersistence:
             template_data['last_saved'] = datetime.now().isoformat()
             template_data['version'] = '1.0'
             
-            with open(self.pdf_template_file, 'w', encoding='utf-8') as f:
-                json.dump(template_data, f, indent=2, ensure_ascii=False)
+            write_json_atomic(self.pdf_template_file, template_data)
             
             return True
         except Exception as e:
@@ -64,10 +60,7 @@ class TemplatePersistence:
     def load_pdf_template(self) -> Optional[Dict[str, Any]]:
         """Load PDF template from disk"""
         try:
-            if self.pdf_template_file.exists():
-                with open(self.pdf_template_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return None
+            return read_json(self.pdf_template_file)
         except Exception as e:
             print(f"Error loading PDF template: {e}")
             return None
@@ -77,8 +70,7 @@ class TemplatePersistence:
         try:
             settings_data['last_saved'] = datetime.now().isoformat()
             
-            with open(self.user_settings_file, 'w', encoding='utf-8') as f:
-                json.dump(settings_data, f, indent=2, ensure_ascii=False)
+            write_json_atomic(self.user_settings_file, settings_data)
             
             return True
         except Exception as e:
@@ -88,10 +80,7 @@ class TemplatePersistence:
     def load_user_settings(self) -> Optional[Dict[str, Any]]:
         """Load user settings"""
         try:
-            if self.user_settings_file.exists():
-                with open(self.user_settings_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return None
+            return read_json(self.user_settings_file)
         except Exception as e:
             print(f"Error loading user settings: {e}")
             return None
@@ -122,8 +111,7 @@ class TemplatePersistence:
         """Delete all saved templates"""
         try:
             for file_path in [self.email_template_file, self.pdf_template_file, self.user_settings_file]:
-                if file_path.exists():
-                    file_path.unlink()
+                file_path.unlink(missing_ok=True)
             return True
         except Exception as e:
             print(f"Error deleting templates: {e}")
@@ -5,20 +5,23 @@ Docker-ready with desktop persistent storage
 """
 
 import streamlit as st
-import pandas as pd
 import os
 import sys
 import logging
-import json
 import base64
+import copy
 import tempfile
 import time
 import platform
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
 from io import BytesIO
 import zipfile
 import re
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 from html import unescape
 
 # Additional imports for missing functionality
@@ -38,6 +41,43 @@ src_path = Path(__file__).parent / 'src'
 if str(src_path) not in sys.path:
     sys.path.insert(0, str(src_path))
 
+# The app's log format never uses caller/thread/process fields, so skip collecting
+# them for every record (the frame walk is the most expensive part of a log call).
+# Set here at the entry point rather than in a utility module, since it is process-wide.
+logging._srcfile = None
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
+# Number of PDF receipts queued ahead of the contact currently being emailed.
+# They are rendered one at a time on a single worker thread: reportlab/fpdf/PyPDF2
+# keep process-wide state (font registry etc.) that is not safe to use concurrently,
+# so only the SMTP I/O on the script thread overlaps with rendering.
+PDF_PREFETCH = 2
+
+# Letterhead PDF locations in priority order, relative to the working directory
+LETTERHEAD_CANDIDATES = (
+    Path('NSNA Atlanta Letterhead Updated.pdf'),
+    Path('src/templates/letterhead_template.pdf')
+)
+CLOUD_LETTERHEAD_CANDIDATES = LETTERHEAD_CANDIDATES + (Path('letterhead_template.pdf'),)
+
+# A live mail merge stops once at least this many contacts were processed
+# and more than a third of them failed (auth failure, rate limit, outage)
+ABORT_MIN_PROCESSED = 30
+
+# Minimum seconds between progress bar/status redraws during a mail merge
+PROGRESS_UPDATE_INTERVAL = 0.5
+
+# Loose address check used to drop unsendable rows before a live mail merge
+EMAIL_ADDRESS_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+# Variables filled in by replace_system_variables rather than the Excel data
+SYSTEM_VARIABLES = ("Current Date", "Current Year", "Current Month", "Today")
+SYSTEM_VARIABLE_NAMES = frozenset(SYSTEM_VARIABLES)
+EDITOR_SYSTEM_VARIABLES = ("Current Year", "Current Date")
+DEFAULT_EDITOR_VARIABLES = ("First Name", "Last Name", "Amount", "Date", "Current Year")
+
 # Enhanced editor no longer needed - using compact streamlit-quill editor
 
 # Rich text editor helper function
@@ -49,60 +89,15 @@ def rich_text_editor(value="", placeholder="", key=None, height=300, overwrite=N
     
     # Default variables if not provided
     if available_variables is None:
-        available_variables = ["First Name", "Last Name", "Amount", "Date", "Current Year"]
+        available_variables = DEFAULT_EDITOR_VARIABLES
     
     # Use streamlit_quill as primary editor with compact embedded toolbar
     if st_quill is not None:
-        # Add custom CSS for ultra-compact, Word-like toolbar
+        # Toolbar and container CSS is injected once per run by main(); only
+        # the editor height varies per call
         st.markdown("""
         <style>
-        /* Make Quill toolbar more compact and Word-like */
-        .ql-toolbar {
-            border: 1px solid #ccc !important;
-            border-bottom: none !important;
-            padding: 4px 8px !important;
-            min-height: 36px !important;
-            background: #f9f9f9 !important;
-        }
-        
-        .ql-toolbar .ql-formats {
-            margin-right: 8px !important;
-        }
-        
-        .ql-toolbar button {
-            height: 24px !important;
-            width: 24px !important;
-            padding: 2px !important;
-            margin: 1px !important;
-            border-radius: 2px !important;
-        }
-        
-        .ql-toolbar button:hover {
-            background: #e6e6e6 !important;
-        }
-        
-        .ql-toolbar button.ql-active {
-            background: #d0d0d0 !important;
-        }
-        
-        .ql-toolbar .ql-picker {
-            font-size: 12px !important;
-        }
-        
-        .ql-toolbar .ql-picker-label {
-            padding: 2px 4px !important;
-            height: 24px !important;
-            line-height: 20px !important;
-        }
-        
-        .ql-container {
-            border: 1px solid #ccc !important;
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', sans-serif !important;
-        }
-        
         .ql-editor {
-            padding: 12px !important;
-            line-height: 1.4 !important;
             min-height: """ + str(height - 40) + """px !important;
         }
         </style>
@@ -138,6 +133,10 @@ def rich_text_editor(value="", placeholder="", key=None, height=300, overwrite=N
         )
 
 # Desktop Storage Configuration
+# Resolve the home directory once per script run instead of in every helper
+HOME_DIR = Path.home()
+USER_SETTINGS_FILE = HOME_DIR / ".nsna_mail_merge_settings.json"
+
 def get_user_configured_path():
     """Get user-configured storage path from session state or saved settings"""
     # Check if user has configured a custom path in session state
@@ -146,14 +145,11 @@ def get_user_configured_path():
     
     # Check for saved custom path from previous sessions
     try:
-        settings_file = Path.home() / ".nsna_mail_merge_settings.json"
-        if settings_file.exists():
-            import json
-            with open(settings_file, 'r') as f:
-                settings = json.load(f)
-                custom_path = settings.get('storage_path')
-                if custom_path and Path(custom_path).exists():
-                    return Path(custom_path)
+        settings = load_json(USER_SETTINGS_FILE)
+        if settings:
+            custom_path = settings.get('storage_path')
+            if custom_path and Path(custom_path).exists():
+                return Path(custom_path)
     except:
         pass
     
@@ -162,44 +158,39 @@ def get_user_configured_path():
 def save_user_storage_path(path):
     """Save user's chosen storage path for future sessions"""
     try:
-        import json
-        settings_file = Path.home() / ".nsna_mail_merge_settings.json"
-        settings = {}
+        settings_file = USER_SETTINGS_FILE
         
         # Load existing settings if any
-        if settings_file.exists():
-            with open(settings_file, 'r') as f:
-                settings = json.load(f)
+        settings = read_json(settings_file) or {}
         
-        # Update storage path
-        settings['storage_path'] = str(path)
-        
-        # Save settings
-        with open(settings_file, 'w') as f:
-            json.dump(settings, f, indent=2)
+        # Update storage path, skipping the write when it is already saved
+        if settings.get('storage_path') != str(path):
+            settings['storage_path'] = str(path)
+            write_json_atomic(settings_file, settings)
         
         # Update session state
         st.session_state.custom_storage_path = str(path)
+        st.session_state.desktop_storage_path = None
         return True
     except Exception as e:
         st.error(f"Failed to save storage path: {e}")
         return False
 
+STORAGE_SUBFOLDERS = ("templates", "data", "receipts", "exports")
+
+def create_storage_folders(nsna_folder):
+    """Create the NSNA Mail Merge folder and its subfolders in one pass"""
+    # parents=True creates nsna_folder itself along with the first subfolder
+    for subfolder in STORAGE_SUBFOLDERS:
+        (nsna_folder / subfolder).mkdir(parents=True, exist_ok=True)
+    return nsna_folder
+
 def get_desktop_storage_path():
     """Get the desktop storage path for persistent data"""
     # First check if user has configured a custom path
     user_path = get_user_configured_path()
     if user_path:
-        nsna_folder = user_path / "NSNA_Mail_Merge"
-        nsna_folder.mkdir(exist_ok=True)
-        
-        # Create subfolders
-        (nsna_folder / "templates").mkdir(exist_ok=True)
-        (nsna_folder / "data").mkdir(exist_ok=True)
-        (nsna_folder / "receipts").mkdir(exist_ok=True)
-        (nsna_folder / "exports").mkdir(exist_ok=True)
-        
-        return nsna_folder
+        return create_storage_folders(user_path / "NSNA_Mail_Merge")
     
     # Check if running in Docker (environment variable set in docker-compose)
     if os.environ.get('DOCKER_DEPLOYMENT', 'false').lower() == 'true':
@@ -211,15 +202,14 @@ def get_desktop_storage_path():
             return Path(os.environ['NSNA_DESKTOP_PATH'])
         
         # Local development - find the correct desktop path
-        import platform
         system = platform.system()
         
         if system == "Windows":
             # Try multiple desktop locations for OneDrive scenarios
             possible_desktops = [
-                Path.home() / "Desktop",
-                Path.home() / "OneDrive" / "Desktop", 
-                Path.home() / "OneDrive - HD Supply, Inc" / "Desktop"
+                HOME_DIR / "Desktop",
+                HOME_DIR / "OneDrive" / "Desktop", 
+                HOME_DIR / "OneDrive - HD Supply, Inc" / "Desktop"
             ]
             
             desktop_path = None
@@ -237,37 +227,35 @@ def get_desktop_storage_path():
             
             # Fallback to Documents if no desktop is writable
             if desktop_path is None:
-                desktop_path = Path.home() / "Documents"
+                desktop_path = HOME_DIR / "Documents"
                 
         elif system == "Darwin":  # macOS
-            desktop_path = Path.home() / "Desktop"
+            desktop_path = HOME_DIR / "Desktop"
         else:  # Linux
-            desktop_path = Path.home() / "Desktop"
+            desktop_path = HOME_DIR / "Desktop"
             # Fallback if Desktop doesn't exist
             if not desktop_path.exists():
-                desktop_path = Path.home() / "Documents"
+                desktop_path = HOME_DIR / "Documents"
     
     # Create NSNA Mail Merge folder on desktop
-    nsna_folder = desktop_path / "NSNA_Mail_Merge"
-    nsna_folder.mkdir(exist_ok=True)
-    
-    # Create subfolders
-    (nsna_folder / "templates").mkdir(exist_ok=True)
-    (nsna_folder / "data").mkdir(exist_ok=True)
-    (nsna_folder / "receipts").mkdir(exist_ok=True)
-    (nsna_folder / "exports").mkdir(exist_ok=True)
-    
-    return nsna_folder
+    return create_storage_folders(desktop_path / "NSNA_Mail_Merge")
+
+def get_session_storage_path():
+    """Resolve the desktop storage path once per session; cleared when the user changes it"""
+    if st.session_state.get('desktop_storage_path') is None:
+        st.session_state.desktop_storage_path = get_desktop_storage_path()
+    return st.session_state.desktop_storage_path
 
 # Global storage path will be set in main function
 DESKTOP_STORAGE = None
 
 # Import existing utility functions
 try:
-    from utils.excel_reader import read_excel, get_contacts_as_list
-    from utils.mail_sender import send_email_with_diagnostics
-    from utils.pdf_generator import PDFGenerator
+    from utils.excel_reader import read_excel, iter_contacts
+    from utils.mail_sender import send_email_with_diagnostics, SMTPSession
+    from utils.pdf_generator import PDFGenerator, TEMPLATE_VARIABLE_PATTERN, find_first_existing, read_letterhead_bytes
     from utils.oauth_manager import get_user_credentials
+    from utils.json_store import load_json, read_json, write_json_atomic
     
     # Desktop-compatible persistence system
     try:
@@ -306,7 +294,7 @@ st.set_page_config(
 def create_desktop_persistence_manager():
     """Create a persistence manager that uses desktop storage"""
     # Get current desktop storage path
-    storage_path = get_desktop_storage_path()
+    storage_path = get_session_storage_path()
     
     class DesktopTemplatePersistence:
         def __init__(self, storage_path):
@@ -317,8 +305,7 @@ def create_desktop_persistence_manager():
             """Save email template to desktop"""
             try:
                 template_file = self.storage_path / "email_template.json"
-                with open(template_file, 'w', encoding='utf-8') as f:
-                    json.dump(template, f, indent=2, ensure_ascii=False)
+                write_json_atomic(template_file, template)
                 return True
             except Exception as e:
                 st.error(f"Failed to save email template: {e}")
@@ -327,11 +314,7 @@ def create_desktop_persistence_manager():
         def load_email_template(self):
             """Load email template from desktop"""
             try:
-                template_file = self.storage_path / "email_template.json"
-                if template_file.exists():
-                    with open(template_file, 'r', encoding='utf-8') as f:
-                        return json.load(f)
-                return None
+                return read_json(self.storage_path / "email_template.json")
             except Exception as e:
                 st.error(f"Failed to load email template: {e}")
                 return None
@@ -340,8 +323,7 @@ def create_desktop_persistence_manager():
             """Save PDF template to desktop"""
             try:
                 template_file = self.storage_path / "pdf_template.json"
-                with open(template_file, 'w', encoding='utf-8') as f:
-                    json.dump(template, f, indent=2, ensure_ascii=False)
+                write_json_atomic(template_file, template)
                 return True
             except Exception as e:
                 st.error(f"Failed to save PDF template: {e}")
@@ -350,11 +332,7 @@ def create_desktop_persistence_manager():
         def load_pdf_template(self):
             """Load PDF template from desktop"""
             try:
-                template_file = self.storage_path / "pdf_template.json"
-                if template_file.exists():
-                    with open(template_file, 'r', encoding='utf-8') as f:
-                        return json.load(f)
-                return None
+                return read_json(self.storage_path / "pdf_template.json")
             except Exception as e:
                 st.error(f"Failed to load PDF template: {e}")
                 return None
@@ -363,8 +341,7 @@ def create_desktop_persistence_manager():
             """Save user settings to desktop"""
             try:
                 settings_file = self.storage_path / "user_settings.json"
-                with open(settings_file, 'w', encoding='utf-8') as f:
-                    json.dump(settings, f, indent=2, ensure_ascii=False)
+                write_json_atomic(settings_file, settings)
                 return True
             except Exception as e:
                 st.error(f"Failed to save user settings: {e}")
@@ -373,11 +350,7 @@ def create_desktop_persistence_manager():
         def load_user_settings(self):
             """Load user settings from desktop"""
             try:
-                settings_file = self.storage_path / "user_settings.json"
-                if settings_file.exists():
-                    with open(settings_file, 'r', encoding='utf-8') as f:
-                        return json.load(f)
-                return None
+                return read_json(self.storage_path / "user_settings.json")
             except Exception as e:
                 st.error(f"Failed to load user settings: {e}")
                 return None
@@ -401,6 +374,10 @@ if 'pdf_template' not in st.session_state:
     st.session_state.pdf_template = None
 if 'loaded_templates' not in st.session_state:
     st.session_state.loaded_templates = False
+if 'current_email_template' not in st.session_state:
+    st.session_state.current_email_template = None
+if 'current_pdf_template' not in st.session_state:
+    st.session_state.current_pdf_template = None
 
 def load_settings():
     """Load application settings"""
@@ -413,21 +390,18 @@ def load_settings():
             'dynamic_user_oauth': DYNAMIC_USER_OAUTH
         }
         
-        # Load email settings
-        email_settings_path = Path('config/email_template_settings.json')
-        if email_settings_path.exists():
-            with open(email_settings_path) as f:
-                email_data = json.load(f)
-                email_settings = EmailTemplateSettings(**email_data)
+        # Load email settings; load_json's result is shared, so copy it before the
+        # dataclasses take ownership of its lists and dicts
+        email_data = load_json('config/email_template_settings.json')
+        if email_data is not None:
+            email_settings = EmailTemplateSettings(**copy.deepcopy(email_data))
         else:
             email_settings = EmailTemplateSettings()
         
         # Load template settings
-        template_settings_path = Path('config/template_settings.json')
-        if template_settings_path.exists():
-            with open(template_settings_path) as f:
-                template_data = json.load(f)
-                template_settings = TemplateSettings(**template_data)
+        template_data = load_json('config/template_settings.json')
+        if template_data is not None:
+            template_settings = TemplateSettings(**copy.deepcopy(template_data))
         else:
             template_settings = TemplateSettings()
             
@@ -458,12 +432,32 @@ def load_saved_templates():
         
         st.session_state.loaded_templates = True
 
+def load_uploaded_excel(uploaded_file):
+    """Parse an uploaded Excel file, reusing the DataFrame until a different file is uploaded"""
+    cached = st.session_state.get('uploaded_excel_cache')
+    if cached is not None and cached[0] == uploaded_file.file_id:
+        return cached[1]
+    
+    # Use temporary file for processing
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
+        tmp_file.write(uploaded_file.getvalue())
+        tmp_file_path = tmp_file.name
+    
+    try:
+        df = read_excel(tmp_file_path)
+    finally:
+        # Clean up temp file
+        os.unlink(tmp_file_path)
+    
+    st.session_state.uploaded_excel_cache = (uploaded_file.file_id, df)
+    return df
+
 def main():
     """Main Streamlit application - Single page layout utilizing full width"""
     
     # Initialize desktop storage and template persistence
     global DESKTOP_STORAGE
-    DESKTOP_STORAGE = get_desktop_storage_path()
+    DESKTOP_STORAGE = get_session_storage_path()
     
     # Initialize template persistence manager if not already done
     if 'template_persistence' not in st.session_state:
@@ -503,6 +497,55 @@ def main():
     .css-1d391kg {
         padding: 0;
     }
+    
+    /* Make Quill toolbar more compact and Word-like */
+    .ql-toolbar {
+        border: 1px solid #ccc !important;
+        border-bottom: none !important;
+        padding: 4px 8px !important;
+        min-height: 36px !important;
+        background: #f9f9f9 !important;
+    }
+    
+    .ql-toolbar .ql-formats {
+        margin-right: 8px !important;
+    }
+    
+    .ql-toolbar button {
+        height: 24px !important;
+        width: 24px !important;
+        padding: 2px !important;
+        margin: 1px !important;
+        border-radius: 2px !important;
+    }
+    
+    .ql-toolbar button:hover {
+        background: #e6e6e6 !important;
+    }
+    
+    .ql-toolbar button.ql-active {
+        background: #d0d0d0 !important;
+    }
+    
+    .ql-toolbar .ql-picker {
+        font-size: 12px !important;
+    }
+    
+    .ql-toolbar .ql-picker-label {
+        padding: 2px 4px !important;
+        height: 24px !important;
+        line-height: 20px !important;
+    }
+    
+    .ql-container {
+        border: 1px solid #ccc !important;
+        font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', sans-serif !important;
+    }
+    
+    .ql-editor {
+        padding: 12px !important;
+        line-height: 1.4 !important;
+    }
     </style>
     """, unsafe_allow_html=True)
     
@@ -545,21 +588,13 @@ def single_page_layout():
         
         if uploaded_file is not None:
             try:
-                # Use temporary file for processing
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue())
-                    tmp_file_path = tmp_file.name
-                
-                df = read_excel(tmp_file_path)
+                df = load_uploaded_excel(uploaded_file)
                 
                 if df is not None and not df.empty:
                     st.session_state.excel_data = df
                     st.success(f"✅ {len(df)} records loaded from {uploaded_file.name}")
                     data_uploaded = True
                 
-                # Clean up temp file
-                os.unlink(tmp_file_path)
-                
             except Exception as e:
                 st.error(f"Error uploading file: {e}")
         else:
@@ -602,12 +637,11 @@ def single_page_layout():
         
         # Show authentication method info
         if st.session_state.email_settings_config:
-            from config.settings import USE_OAUTH
             auth_info = "🔐 OAuth 2.0" if USE_OAUTH else "🔑 Password"
 
         
         if (data_uploaded and email_settings_valid and 
-            hasattr(st.session_state, 'current_email_template')):
+            st.session_state.current_email_template is not None):
             
             df = st.session_state.excel_data
             template = st.session_state.current_email_template
@@ -650,17 +684,15 @@ def single_page_layout():
     # Results section (if any)
     if st.session_state.sent_emails:
         st.header("📈 Results")
-        sent_df = pd.DataFrame(st.session_state.sent_emails)
+        status_counts = Counter(entry['status'] for entry in st.session_state.sent_emails)
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Total", len(sent_df))
+            st.metric("Total", len(st.session_state.sent_emails))
         with col2:
-            successful = len(sent_df[sent_df['status'] == 'Success'])
-            st.metric("Success", successful)
+            st.metric("Success", status_counts['Success'])
         with col3:
-            failed = len(sent_df[sent_df['status'] == 'Failed'])
-            st.metric("Failed", failed)
+            st.metric("Failed", status_counts['Failed'])
         with col4:
             if st.button("🗑️ Clear Results", use_container_width=True):
                 st.session_state.sent_emails = []
@@ -718,7 +750,7 @@ Email: nsnatreasurer@achi.org"""
             if st.session_state.excel_data is not None:
                 available_vars.extend(st.session_state.excel_data.columns.tolist())
             # Add system variables
-            available_vars.extend(["Current Year", "Current Date"])
+            available_vars.extend(EDITOR_SYSTEM_VARIABLES)
             
             # Use streamlit-quill editor with embedded toolbar
             email_content = rich_text_editor(
@@ -786,24 +818,15 @@ Email: nsnatreasurer@achi.org"""
                 with st.expander("📧 Preview Email Template"):
                     if st.session_state.excel_data is not None and len(st.session_state.excel_data) > 0:
                         sample_row = st.session_state.excel_data.iloc[0]
-                        preview_content = email_content
-                        
-                        # Replace system variables first
-                        preview_content = replace_system_variables(preview_content)
-                        
-                        # Then replace Excel data variables
-                        for col in st.session_state.excel_data.columns:
-                            preview_content = preview_content.replace(f"{{{col}}}", str(sample_row[col]))
                         
                         st.markdown("**Preview with sample data:**")
-                        # Use clean_html_content to ensure proper HTML formatting
-                        clean_preview = clean_html_content(preview_content)
+                        # System variables, then Excel data, then clean_html_content for proper HTML formatting
+                        clean_preview = render_template_preview('email_preview_cache', email_content, sample_row.to_dict())
                         st.markdown(clean_preview, unsafe_allow_html=True)
                     else:
                         # Show preview with just system variables
-                        preview_content = replace_system_variables(email_content)
                         st.markdown("**Preview with system variables:**")
-                        clean_preview = clean_html_content(preview_content)
+                        clean_preview = render_template_preview('email_preview_cache', email_content)
                         st.markdown(clean_preview, unsafe_allow_html=True)
                         st.info("Upload data to see preview with Excel variables")
         else:
@@ -813,19 +836,7 @@ Email: nsnatreasurer@achi.org"""
         st.subheader("📄 PDF Template")
         
         # Check for letterhead
-        if CLOUD_DEPLOYMENT:
-            letterhead_path = get_letterhead_path()
-        else:
-            letterhead_paths = [
-                Path('NSNA Atlanta Letterhead Updated.pdf'),
-                Path('src/templates/letterhead_template.pdf')
-            ]
-            
-            letterhead_path = None
-            for path in letterhead_paths:
-                if path.exists():
-                    letterhead_path = path
-                    break
+        letterhead_path = find_letterhead_path()
         
         if letterhead_path:
             # Check if user has a saved PDF template
@@ -883,7 +894,7 @@ Treasurer, NSNA<br>
             if st.session_state.excel_data is not None:
                 available_vars.extend(st.session_state.excel_data.columns.tolist())
             # Add system variables
-            available_vars.extend(["Current Year", "Current Date"])
+            available_vars.extend(EDITOR_SYSTEM_VARIABLES)
             
             # Use compact rich text editor for PDF template (same as email)
             pdf_content = rich_text_editor(
@@ -916,25 +927,16 @@ Treasurer, NSNA<br>
                 with st.expander("📄 Preview PDF Template"):
                     if st.session_state.excel_data is not None and len(st.session_state.excel_data) > 0:
                         sample_row = st.session_state.excel_data.iloc[0]
-                        preview_content = pdf_content
-                        
-                        # Replace system variables first
-                        preview_content = replace_system_variables(preview_content)
-                        
-                        # Then replace Excel data variables
-                        for col in st.session_state.excel_data.columns:
-                            preview_content = preview_content.replace(f"{{{col}}}", str(sample_row[col]))
                         
                         st.markdown("**Preview with sample data (formatted as it will appear in PDF):**")
                         # Show the HTML content with formatting preserved instead of converting to plain text
-                        clean_preview = clean_html_content(preview_content)
+                        clean_preview = render_template_preview('pdf_preview_cache', pdf_content, sample_row.to_dict())
                         st.markdown(clean_preview, unsafe_allow_html=True)
                         st.info("💡 This preview shows the formatted content. Bold and italic formatting will be preserved in the generated PDF.")
                     else:
                         # Show preview with just system variables
-                        preview_content = replace_system_variables(pdf_content)
                         st.markdown("**Preview with system variables (formatted as it will appear in PDF):**")
-                        clean_preview = clean_html_content(preview_content)
+                        clean_preview = render_template_preview('pdf_preview_cache', pdf_content)
                         st.markdown(clean_preview, unsafe_allow_html=True)
                         st.info("Upload data to see preview with Excel variables")
         else:
@@ -955,13 +957,8 @@ def data_settings_tab():
     
     if uploaded_file is not None:
         try:
-            # Save uploaded file temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-                tmp_file.write(uploaded_file.getvalue())
-                tmp_file_path = tmp_file.name
-            
             # Read Excel data
-            df = read_excel(tmp_file_path)
+            df = load_uploaded_excel(uploaded_file)
             
             if df is not None and not df.empty:
                 st.session_state.excel_data = df
@@ -971,9 +968,6 @@ def data_settings_tab():
                 # Display data preview
                 st.dataframe(df.head(3), use_container_width=True)
             
-            # Clean up temporary file
-            os.unlink(tmp_file_path)
-            
         except Exception as e:
             st.error(f"Error reading file: {e}")
     else:
@@ -1021,7 +1015,6 @@ def templates_sending_tab():
     
     # Check if setup is complete (simplified check)
     if (st.session_state.excel_data is None or 
-        not hasattr(st.session_state, 'email_settings') or
         st.session_state.email_settings is None):
         st.info("Complete Data & Settings tab first")
         return
@@ -1030,7 +1023,7 @@ def templates_sending_tab():
     st.header("📧 Send Emails")
     
     # Check if we have email template before showing send buttons
-    if hasattr(st.session_state, 'current_email_template'):
+    if st.session_state.current_email_template is not None:
         df = st.session_state.excel_data
         template = st.session_state.current_email_template
         
@@ -1051,18 +1044,16 @@ def templates_sending_tab():
         
         # Results section (simplified)
         if st.session_state.sent_emails:
-            sent_df = pd.DataFrame(st.session_state.sent_emails)
+            status_counts = Counter(entry['status'] for entry in st.session_state.sent_emails)
             
             # Simple metrics in one row
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("Total", len(sent_df))
+                st.metric("Total", len(st.session_state.sent_emails))
             with col2:
-                successful = len(sent_df[sent_df['status'] == 'Success'])
-                st.metric("Success", successful)
+                st.metric("Success", status_counts['Success'])
             with col3:
-                failed = len(sent_df[sent_df['status'] == 'Failed'])
-                st.metric("Failed", failed)
+                st.metric("Failed", status_counts['Failed'])
             with col4:
                 if st.button("🗑️ Clear", key="clear_results"):
                     st.session_state.sent_emails = []
@@ -1089,7 +1080,7 @@ def email_template_subtab():
     """Email Template subtab content"""
     
     # Check if email settings exist
-    if not hasattr(st.session_state, 'email_settings') or st.session_state.email_settings is None:
+    if st.session_state.email_settings is None:
         st.warning("Please complete the Data & Settings tab first to set your email configuration.")
         return
     
@@ -1161,19 +1152,7 @@ def pdf_template_subtab():
     """PDF Template subtab content"""
     
     # Check for letterhead
-    if CLOUD_DEPLOYMENT:
-        letterhead_path = get_letterhead_path()
-    else:
-        letterhead_paths = [
-            Path('NSNA Atlanta Letterhead Updated.pdf'),
-            Path('src/templates/letterhead_template.pdf')
-        ]
-        
-        letterhead_path = None
-        for path in letterhead_paths:
-            if path.exists():
-                letterhead_path = path
-                break
+    letterhead_path = find_letterhead_path()
     
     if letterhead_path:
         # Default PDF content
@@ -1276,13 +1255,14 @@ def generate_sample_pdf(pdf_content, letterhead_path):
             pdf_generator = PDFGenerator()
             
             # Create sample data
+            today_values = system_variable_values(datetime.now().date())
             sample_data = {
                 'First Name': 'John',
                 'Last Name': 'Smith',
                 'Email': 'john.smith@email.com',
                 'Amount': '150.00',
-                'Date': datetime.now().strftime('%Y-%m-%d'),
-                'Year': datetime.now().strftime('%Y'),
+                'Date': today_values["{Current Date}"],
+                'Year': today_values["{Current Year}"],
             }
             
             # Process PDF content with sample data
@@ -1292,8 +1272,7 @@ def generate_sample_pdf(pdf_content, letterhead_path):
             pdf_content_with_sample = replace_system_variables(pdf_content_with_sample)
             
             # Replace sample data variables
-            for key, value in sample_data.items():
-                pdf_content_with_sample = pdf_content_with_sample.replace(f"{{{key}}}", str(value))
+            pdf_content_with_sample = substitute_variables(pdf_content_with_sample, sample_data)
             
             # Pass HTML content directly to PDF generator for proper formatting
             sample_data['content'] = pdf_content_with_sample
@@ -1334,16 +1313,14 @@ def preview_templates_section():
     """Preview email and PDF templates"""
     st.subheader("�📧 Template Preview")
     
-    if hasattr(st.session_state, 'current_email_template'):
+    if st.session_state.current_email_template is not None:
         template = st.session_state.current_email_template
         
         # Create sample data for preview
         sample_data = create_sample_data()
         
         # Generate preview content
-        preview_content = template['content']
-        for var, value in sample_data.items():
-            preview_content = preview_content.replace(f"{{{var}}}", str(value))
+        preview_content = substitute_variables(template['content'], sample_data)
         
         # Convert markdown to HTML for preview (same as PDF generator)
         if '**' in preview_content or '*' in preview_content:
@@ -1359,7 +1336,7 @@ def preview_templates_section():
         st.markdown(preview_content, unsafe_allow_html=True)
         
         # PDF Preview Section
-        if hasattr(st.session_state, 'current_pdf_template'):
+        if st.session_state.current_pdf_template is not None:
             st.markdown("---")
             st.markdown("### � PDF Preview")
             
@@ -1367,9 +1344,7 @@ def preview_templates_section():
             pdf_content = pdf_template.get('content', 'No PDF content created yet.')
             
             # Replace sample data in PDF content
-            pdf_preview = pdf_content
-            for var, value in sample_data.items():
-                pdf_preview = pdf_preview.replace(f"{{{var}}}", str(value))
+            pdf_preview = substitute_variables(pdf_content, sample_data)
             
             # Convert markdown to HTML for PDF preview display
             if '**' in pdf_preview or '*' in pdf_preview:
@@ -1386,6 +1361,7 @@ def preview_templates_section():
 def create_sample_data():
     """Create sample data for previews"""
     sample_data = {}
+    today_values = system_variable_values(datetime.now().date())
     available_vars = list(st.session_state.excel_data.columns) if st.session_state.excel_data is not None else []
     
     if available_vars:
@@ -1399,23 +1375,70 @@ def create_sample_data():
             elif 'amount' in var.lower():
                 sample_data[var] = "150.00"
             elif 'date' in var.lower():
-                sample_data[var] = datetime.now().strftime("%Y-%m-%d")
+                sample_data[var] = today_values["{Current Date}"]
             elif 'year' in var.lower():
-                sample_data[var] = datetime.now().strftime("%Y")
+                sample_data[var] = today_values["{Current Year}"]
             else:
                 sample_data[var] = f"Sample {var}"
     
     # Add standard variables
     sample_data.update({
         'Amount': '150.00',
-        'Year': datetime.now().strftime('%Y'),
-        'Date': datetime.now().strftime('%Y-%m-%d')
+        'Year': today_values["{Current Year}"],
+        'Date': today_values["{Current Date}"]
     })
     
     return sample_data
 
 # Helper functions for template management and mail merge operations
 
+def find_letterhead_path():
+    """Locate the letterhead PDF; candidates in the same folder share one directory listing"""
+    if CLOUD_DEPLOYMENT:
+        return get_letterhead_path()
+    return find_first_existing(LETTERHEAD_CANDIDATES)
+
+def generate_contact_pdf(row_dict, pdf_template_parts, letterhead_path):
+    """Render one contact's PDF receipt on a worker thread.
+    
+    Returns (pdf_path, debug_lines); must not call st.* since it runs off the script thread.
+    """
+    pdf_path = None
+    debug_lines = []
+    if not pdf_template_parts:
+        return pdf_path, debug_lines
+    
+    try:
+        pdf_generator = PDFGenerator()
+        pdf_data = row_dict.copy()
+        
+        # System variables were filled in when the template was compiled; add the Excel data
+        pdf_content_with_vars = render_template(pdf_template_parts, row_dict)
+        
+        # Pass HTML content directly to PDF generator for proper formatting
+        pdf_data['content'] = pdf_content_with_vars
+        
+        if letterhead_path:
+            pdf_data['template_path'] = str(letterhead_path)
+            pdf_path = pdf_generator.generate_receipt(pdf_data)
+            debug_lines.append(f"✅ **PDF GENERATED:** {pdf_path}")
+        else:
+            debug_lines.append("⚠️ **WARNING:** No letterhead found, PDF not generated")
+    except Exception as pdf_error:
+        debug_lines.append(f"❌ **PDF ERROR:** {pdf_error}")
+    
+    return pdf_path, debug_lines
+
+def prefetch_map(executor, fn, items, window):
+    """Yield (item, future) pairs in order, keeping up to `window` later items already submitted"""
+    pending = deque()
+    for item in items:
+        pending.append((item, executor.submit(fn, item)))
+        if len(pending) > window:
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
+
 def execute_mail_merge(df, template, send_mode, delay_between_emails):
     """Execute the mail merge process - always use current editor content"""
     
@@ -1441,6 +1464,10 @@ def execute_mail_merge(df, template, send_mode, delay_between_emails):
     
     successful_sends = 0
     failed_sends = 0
+    aborted = False
+    last_progress_update = 0.0
+    pdf_executor = ThreadPoolExecutor(max_workers=1)
+    smtp_session = None
     
     try:
         # Debug: Show what templates we're working with
@@ -1481,7 +1508,7 @@ def execute_mail_merge(df, template, send_mode, delay_between_emails):
             st.session_state.debug_log.append(f"   - Session state current_email_content: '{st.session_state.get('current_email_content', 'NOT FOUND')}'")
             
             # Try to get content from current template as fallback
-            if hasattr(st.session_state, 'current_email_template') and st.session_state.current_email_template:
+            if st.session_state.current_email_template:
                 fallback_content = st.session_state.current_email_template.get('content', '')
                 if fallback_content:
                     latest_email_content = fallback_content
@@ -1510,8 +1537,8 @@ def execute_mail_merge(df, template, send_mode, delay_between_emails):
         # Import OAuth settings from config
         from config.settings import GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET
         
-        # Create SMTP settings for OAuth authentication
-        smtp_settings = {
+        # Create SMTP settings for OAuth authentication; read-only since it is shared by every send
+        smtp_settings = MappingProxyType({
             'smtp_server': 'smtp.gmail.com',
             'smtp_port': 587,
             'smtp_user_name': from_email,
@@ -1519,147 +1546,147 @@ def execute_mail_merge(df, template, send_mode, delay_between_emails):
             'dynamic_user_oauth': True,
             'client_id': GOOGLE_CLIENT_ID,
             'client_secret': GOOGLE_CLIENT_SECRET
-        }
+        })
+        
+        # One authenticated connection for the whole run instead of a
+        # connect + STARTTLS + XOAUTH2 handshake per contact
+        smtp_session = SMTPSession(from_email, smtp_settings)
         
         # Show authentication method to user
         status_text.text(f"🔐 Authenticating with OAuth 2.0 for {from_email}...")
         st.session_state.debug_log.append(f"🔐 **AUTHENTICATION:** OAuth 2.0 for {from_email}")
 
+        # Compile the templates once: system variables are the same for every contact,
+        # only the Excel variables differ
+        email_template_parts = compile_template(replace_system_variables(latest_email_content))
+        subject_template_parts = compile_template(replace_system_variables(subject_template))
+        pdf_template_parts = None
+        if latest_pdf_content.strip():
+            pdf_template_parts = compile_template(replace_system_variables(latest_pdf_content))
+        letterhead_path = find_letterhead_path() if pdf_template_parts else None
+        if letterhead_path:
+            # Load the letterhead into the shared cache in the background while the
+            # first rows are prepared, so the first receipts don't wait on the disk
+            pdf_executor.submit(read_letterhead_bytes, letterhead_path)
+        
+        # Loop invariants: bound list methods and the send mode are looked up once, not per contact
+        log = st.session_state.debug_log.append
+        log_lines = st.session_state.debug_log.extend
+        record_result = st.session_state.sent_emails.append
+        is_live = send_mode == "Live Mode"
+        
+        # Drop rows without a usable address up front so they cost no PDF render or SMTP attempt
+        skipped_invalid = 0
+        if is_live and 'Email' in df.columns:
+            valid = df['Email'].astype('string').str.strip().str.match(EMAIL_ADDRESS_PATTERN, na=False)
+            invalid_rows = df[~valid]
+            if not invalid_rows.empty:
+                skipped_invalid = len(invalid_rows)
+                failed_sends += skipped_invalid
+                log(f"⚠️ **SKIPPED {skipped_invalid} ROWS WITH INVALID EMAIL ADDRESSES**")
+                for contact in iter_contacts(invalid_rows):
+                    log(f"   - {contact.get('First Name')} {contact.get('Last Name')}: '{contact['Email']}'")
+                    record_result({
+                        'name': f"{contact.get('First Name')} {contact.get('Last Name')}",
+                        'email': contact['Email'],
+                        'status': 'Failed - Invalid Email',
+                        'timestamp': datetime.now()
+                    })
+                df = df[valid]
+        
         total_emails = len(df)
         
-        for index, row in df.iterrows():
+        # Render PDFs serially on the worker thread so they overlap with the SMTP round trips
+        contacts = prefetch_map(
+            pdf_executor,
+            lambda item: generate_contact_pdf(item[1], pdf_template_parts, letterhead_path),
+            enumerate(iter_contacts(df)),
+            PDF_PREFETCH
+        )
+        
+        for (index, row), pdf_future in contacts:
+            # index is the number of contacts processed so far; pre-skipped rows don't count
+            if is_live and index >= ABORT_MIN_PROCESSED and (failed_sends - skipped_invalid) * 3 > index:
+                aborted = True
+                log(f"⛔ **MAIL MERGE STOPPED:** {failed_sends - skipped_invalid} of {index} emails failed")
+                break
+            
             try:
-                # Update progress
-                progress = (index + 1) / total_emails
-                progress_bar.progress(progress)
-                status_text.text(f"Processing {index + 1}/{total_emails}: {row['First Name']} {row['Last Name']}")
+                # Update progress; each redraw is a round trip to the browser, so throttle them
+                now = time.monotonic()
+                if now - last_progress_update >= PROGRESS_UPDATE_INTERVAL or index + 1 == total_emails:
+                    last_progress_update = now
+                    progress = (index + 1) / total_emails
+                    progress_bar.progress(progress)
+                    status_text.text(f"Processing {index + 1}/{total_emails}: {row['First Name']} {row['Last Name']}")
                 
                 # Add debug info for this recipient
                 recipient_name = f"{row['First Name']} {row['Last Name']}"
-                st.session_state.debug_log.append(f"\n📧 **PROCESSING: {recipient_name}**")
+                log(f"\n📧 **PROCESSING: {recipient_name}**")
                 
                 # Generate personalized content using current template
-                row_dict = row.to_dict()
-                personalized_content = current_template['content']
                 personalized_subject = subject_template
                 
-                st.session_state.debug_log.append(f"- **Original content length:** {len(personalized_content) if personalized_content else 0}")
-                st.session_state.debug_log.append(f"- **Original subject:** {personalized_subject}")
+                log(f"- **Original content length:** {len(current_template['content'])}")
+                log(f"- **Original subject:** {personalized_subject}")
                 
-                # Ensure content is not None before processing
-                if personalized_content is None:
-                    personalized_content = ''
-                    st.session_state.debug_log.append("⚠️ **WARNING:** Personalized content was None")
+                # Ensure subject is not None before processing
                 if personalized_subject is None:
                     personalized_subject = 'NSNA Donation Receipt'
-                    st.session_state.debug_log.append("⚠️ **WARNING:** Personalized subject was None")
+                    log("⚠️ **WARNING:** Personalized subject was None")
                 
-                # First replace system variables
-                personalized_content = replace_system_variables(personalized_content)
-                personalized_subject = replace_system_variables(personalized_subject)
+                # System variables were filled in when the subject was compiled; add the Excel data
+                personalized_subject = render_template(subject_template_parts, row)
                 
-                # Then replace Excel data variables
-                for col, value in row_dict.items():
-                    if personalized_content:  # Only if not empty
-                        personalized_content = personalized_content.replace(f"{{{col}}}", str(value))
-                    if personalized_subject:  # Only if not empty
-                        personalized_subject = personalized_subject.replace(f"{{{col}}}", str(value))
+                # Fill in this contact's data, then clean the HTML - the same order as the
+                # preview, so values get the markdown/newline conversion and empty paragraphs go
+                email_content = clean_html_content(render_template(email_template_parts, row))
                 
-                # Clean HTML content for email - preserve HTML formatting
-                email_content = clean_html_content(personalized_content)
-                
-                st.session_state.debug_log.append(f"- **Final email content length:** {len(email_content) if email_content else 0}")
+                log(f"- **Final email content length:** {len(email_content) if email_content else 0}")
                 
                 # Add detailed content debugging
                 if email_content:
-                    st.session_state.debug_log.append(f"- **Final email content preview:** '{email_content[:200]}{'...' if len(email_content) > 200 else ''}'")
+                    log(f"- **Final email content preview:** '{email_content[:200]}{'...' if len(email_content) > 200 else ''}'")
                 else:
-                    st.session_state.debug_log.append("- **Final email content is empty!**")
+                    log("- **Final email content is empty!**")
                 
                 # Check for remaining unreplaced variables
-                remaining_vars = re.findall(r'\{[^}]+\}', email_content + " " + personalized_subject)
+                remaining_vars = [match.group(0) for match in TEMPLATE_VARIABLE_PATTERN.finditer(email_content + " " + personalized_subject)]
                 if remaining_vars:
-                    st.session_state.debug_log.append(f"⚠️ **UNREPLACED VARIABLES:** {', '.join(remaining_vars)}")
+                    log(f"⚠️ **UNREPLACED VARIABLES:** {', '.join(remaining_vars)}")
                 
                 # Validate email content before sending
                 if not email_content or email_content.strip() == "":
-                    st.session_state.debug_log.append("❌ **CRITICAL ERROR:** Final email content is empty!")
-                    st.session_state.debug_log.append(f"   - Raw personalized content: '{personalized_content}'")
-                    st.session_state.debug_log.append(f"   - Cleaned email content: '{email_content}'")
+                    log("❌ **CRITICAL ERROR:** Final email content is empty!")
+                    log(f"   - Raw template content: '{current_template['content']}'")
+                    log(f"   - Cleaned email content: '{email_content}'")
                     # Skip this email
+                    pdf_future.cancel()
                     failed_sends += 1
-                    st.session_state.sent_emails.append({
+                    record_result({
                         'name': recipient_name,
-                        'email': row['Email'] if send_mode == "Live Mode" else from_email,
+                        'email': row['Email'] if is_live else from_email,
                         'status': 'Failed - Empty Content',
                         'timestamp': datetime.now()
                     })
                     continue
                 
-                # Generate PDF receipt if template exists
-                pdf_path = None
-                if latest_pdf_content and latest_pdf_content.strip():
-                    try:
-                        pdf_generator = PDFGenerator()
-                        pdf_data = row_dict.copy()
-                        
-                        # Use latest PDF content from editor
-                        pdf_content = latest_pdf_content
-                        
-                        # Ensure PDF content is not None
-                        if pdf_content is None:
-                            pdf_content = ''
-                        
-                        # For PDF: First replace variables in HTML, then convert to plain text
-                        pdf_content_with_vars = pdf_content
-                        
-                        # First replace system variables (only if content exists)
-                        if pdf_content_with_vars:
-                            pdf_content_with_vars = replace_system_variables(pdf_content_with_vars)
-                            
-                            # Then replace Excel data variables
-                            for col, value in row_dict.items():
-                                if pdf_content_with_vars:  # Check again after system variable replacement
-                                    pdf_content_with_vars = pdf_content_with_vars.replace(f"{{{col}}}", str(value))
-                        
-                        # Pass HTML content directly to PDF generator for proper formatting
-                        pdf_data['content'] = pdf_content_with_vars
-                        
-                        # Get letterhead path
-                        letterhead_path = None
-                        if CLOUD_DEPLOYMENT:
-                            letterhead_path = get_letterhead_path()
-                        else:
-                            letterhead_paths = [
-                                Path('NSNA Atlanta Letterhead Updated.pdf'),
-                                Path('src/templates/letterhead_template.pdf')
-                            ]
-                            for path in letterhead_paths:
-                                if path.exists():
-                                    letterhead_path = path
-                                    break
-                        
-                        if letterhead_path:
-                            pdf_data['template_path'] = str(letterhead_path)
-                            pdf_path = pdf_generator.generate_receipt(pdf_data)
-                            st.session_state.debug_log.append(f"✅ **PDF GENERATED:** {pdf_path}")
-                        else:
-                            st.session_state.debug_log.append("⚠️ **WARNING:** No letterhead found, PDF not generated")
-                    except Exception as pdf_error:
-                        st.session_state.debug_log.append(f"❌ **PDF ERROR:** {pdf_error}")
+                # Collect the PDF receipt rendered ahead of time on the worker pool
+                pdf_path, pdf_log = pdf_future.result()
+                log_lines(pdf_log)
                 
                 # Determine recipient email
-                recipient_email = row['Email'] if send_mode == "Live Mode" else from_email
-                st.session_state.debug_log.append(f"- **Recipient Email:** {recipient_email}")
-                st.session_state.debug_log.append(f"- **Has PDF Attachment:** {'Yes' if pdf_path else 'No'}")
+                recipient_email = row['Email'] if is_live else from_email
+                log(f"- **Recipient Email:** {recipient_email}")
+                log(f"- **Has PDF Attachment:** {'Yes' if pdf_path else 'No'}")
                 
                 # Send email with enhanced error handling
-                st.session_state.debug_log.append(f"🚀 **ATTEMPTING TO SEND EMAIL**")
-                st.session_state.debug_log.append(f"   - **From:** {from_email}")
-                st.session_state.debug_log.append(f"   - **To:** {recipient_email}")
-                st.session_state.debug_log.append(f"   - **Subject:** {personalized_subject}")
-                st.session_state.debug_log.append(f"   - **Content Length:** {len(email_content)} chars")
-                st.session_state.debug_log.append(f"   - **Has Attachment:** {'Yes' if pdf_path else 'No'}")
+                log(f"🚀 **ATTEMPTING TO SEND EMAIL**")
+                log(f"   - **From:** {from_email}")
+                log(f"   - **To:** {recipient_email}")
+                log(f"   - **Subject:** {personalized_subject}")
+                log(f"   - **Content Length:** {len(email_content)} chars")
+                log(f"   - **Has Attachment:** {'Yes' if pdf_path else 'No'}")
                 
                 try:
                     success = send_email_debug_wrapper(
@@ -1669,39 +1696,40 @@ def execute_mail_merge(df, template, send_mode, delay_between_emails):
                         html_content=email_content,
                         attachment_path=pdf_path,
                         smtp_settings=smtp_settings,
-                        is_test=(send_mode == "Test Mode")
+                        is_test=not is_live,
+                        session=smtp_session
                     )
                     
                     # Additional check to ensure success is boolean
                     if success is True:
-                        st.session_state.debug_log.append("✅ **EMAIL SENT SUCCESSFULLY**")
+                        log("✅ **EMAIL SENT SUCCESSFULLY**")
                     elif success is False:
-                        st.session_state.debug_log.append("❌ **EMAIL SEND FAILED** (send_email returned False)")
-                        st.session_state.debug_log.append("   - This usually indicates authentication or SMTP configuration issues")
+                        log("❌ **EMAIL SEND FAILED** (send_email returned False)")
+                        log("   - This usually indicates authentication or SMTP configuration issues")
                     else:
-                        st.session_state.debug_log.append(f"⚠️ **UNEXPECTED RETURN VALUE:** send_email returned {type(success).__name__}: {success}")
+                        log(f"⚠️ **UNEXPECTED RETURN VALUE:** send_email returned {type(success).__name__}: {success}")
                         success = False
                         
                 except Exception as email_error:
-                    st.session_state.debug_log.append(f"❌ **EMAIL ERROR:** {str(email_error)}")
-                    st.session_state.debug_log.append(f"   - **Error Type:** {type(email_error).__name__}")
+                    log(f"❌ **EMAIL ERROR:** {str(email_error)}")
+                    log(f"   - **Error Type:** {type(email_error).__name__}")
                     
                     # Additional debugging for common issues
                     error_str = str(email_error).lower()
                     if "authentication" in error_str or "oauth" in error_str:
-                        st.session_state.debug_log.append("🔐 **DIAGNOSIS:** Authentication Issue - Check OAuth credentials")
+                        log("🔐 **DIAGNOSIS:** Authentication Issue - Check OAuth credentials")
                     elif "smtp" in error_str or "connection" in error_str:
-                        st.session_state.debug_log.append("📡 **DIAGNOSIS:** SMTP/Connection Issue - Check internet connection")
+                        log("📡 **DIAGNOSIS:** SMTP/Connection Issue - Check internet connection")
                     elif "attachment" in error_str:
-                        st.session_state.debug_log.append("📎 **DIAGNOSIS:** Attachment Issue - Check PDF generation")
+                        log("📎 **DIAGNOSIS:** Attachment Issue - Check PDF generation")
                     elif "recipient" in error_str or "email" in error_str:
-                        st.session_state.debug_log.append("📧 **DIAGNOSIS:** Email Address Issue - Check recipient email format")
+                        log("📧 **DIAGNOSIS:** Email Address Issue - Check recipient email format")
                     
                     success = False
                 
                 if success:
                     successful_sends += 1
-                    st.session_state.sent_emails.append({
+                    record_result({
                         'name': recipient_name,
                         'email': recipient_email,
                         'status': 'Success',
@@ -1709,7 +1737,7 @@ def execute_mail_merge(df, template, send_mode, delay_between_emails):
                     })
                 else:
                     failed_sends += 1
-                    st.session_state.sent_emails.append({
+                    record_result({
                         'name': recipient_name,
                         'email': recipient_email,
                         'status': 'Failed',
@@ -1721,12 +1749,16 @@ def execute_mail_merge(df, template, send_mode, delay_between_emails):
                 
             except Exception as e:
                 failed_sends += 1
-                st.session_state.debug_log.append(f"❌ **PROCESSING ERROR for {recipient_name}:** {e}")
+                log(f"❌ **PROCESSING ERROR for {recipient_name}:** {e}")
                 st.error(f"Failed to process {row['First Name']} {row['Last Name']}: {e}")
         
         # Final results
-        progress_bar.progress(1.0)
-        status_text.text("✅ Mail merge complete!")
+        if aborted:
+            status_text.text("⛔ Mail merge stopped early!")
+            st.error(f"⛔ Stopped after {failed_sends - skipped_invalid} of {successful_sends + failed_sends - skipped_invalid} emails failed - check your sign-in and connection before retrying")
+        else:
+            progress_bar.progress(1.0)
+            status_text.text("✅ Mail merge complete!")
         
         # Show simple results summary
         if successful_sends > 0:
@@ -1755,6 +1787,11 @@ def execute_mail_merge(df, template, send_mode, delay_between_emails):
             with st.expander("🔍 **Detailed Debug Log**", expanded=True):
                 for log_entry in st.session_state.debug_log:
                     st.markdown(log_entry)
+    
+    finally:
+        pdf_executor.shutdown(wait=False, cancel_futures=True)
+        if smtp_session is not None:
+            smtp_session.close()
 
 def convert_markdown_to_html(content):
     """Convert markdown formatting to HTML for better preview display"""
@@ -1798,8 +1835,6 @@ def clean_html_content(html_content):
         cleaned = html_content
         
         # Clean up Quill-specific formatting
-        import re
-        
         # Remove empty paragraphs
         cleaned = re.sub(r'<p>\s*<br>\s*</p>', '', cleaned)
         cleaned = re.sub(r'<p>\s*</p>', '', cleaned)
@@ -1962,7 +1997,6 @@ def html_to_plain_text(html_content):
     except ImportError:
         # Fallback to regex if BeautifulSoup not available
         text = html_content
-        import re
         
         # Handle headers first
         for i in range(1, 7):
@@ -2075,9 +2109,7 @@ def show_available_variables():
         excel_vars = list(st.session_state.excel_data.columns)
     
     # Add system variables
-    system_vars = ["Current Date", "Current Year", "Current Month", "Today"]
-    
-    return excel_vars + system_vars
+    return excel_vars + list(SYSTEM_VARIABLES)
 
 def create_variable_interface(columns, key_prefix):
     """Create an easy-to-copy variable interface"""
@@ -2087,8 +2119,8 @@ def create_variable_interface(columns, key_prefix):
     st.markdown("**📋 Available Variables**")
     
     # Create tabs for different variable types
-    excel_vars = [col for col in columns if col not in ["Current Date", "Current Year", "Current Month", "Today"]]
-    system_vars = [col for col in columns if col in ["Current Date", "Current Year", "Current Month", "Today"]]
+    excel_vars = [col for col in columns if col not in SYSTEM_VARIABLE_NAMES]
+    system_vars = [col for col in columns if col in SYSTEM_VARIABLE_NAMES]
     
     # Show variables in columns
     if excel_vars:
@@ -2181,25 +2213,19 @@ def create_storage_directory_selector():
 def reset_storage_path():
     """Reset storage path to default"""
     try:
-        import json
-        settings_file = Path.home() / ".nsna_mail_merge_settings.json"
+        settings_file = USER_SETTINGS_FILE
         
-        if settings_file.exists():
-            # Load existing settings
-            with open(settings_file, 'r') as f:
-                settings = json.load(f)
-            
-            # Remove storage path
-            if 'storage_path' in settings:
-                del settings['storage_path']
-            
-            # Save updated settings
-            with open(settings_file, 'w') as f:
-                json.dump(settings, f, indent=2)
+        # Load existing settings
+        settings = read_json(settings_file)
+        if settings is not None and 'storage_path' in settings:
+            # Remove storage path and save updated settings
+            del settings['storage_path']
+            write_json_atomic(settings_file, settings)
         
         # Clear session state
         if 'custom_storage_path' in st.session_state:
             del st.session_state.custom_storage_path
+        st.session_state.desktop_storage_path = None
         
         return True
     except Exception as e:
@@ -2229,26 +2255,68 @@ def show_send_confirmation_dialog(df, template, mode):
     
     return False
 
+@lru_cache(maxsize=1)
+def system_variable_values(day):
+    """System variable values for the given date, formatted once per day"""
+    return {
+        "{Current Date}": day.strftime("%Y-%m-%d"),
+        "{Current Year}": day.strftime("%Y"),
+        "{Current Month}": day.strftime("%B"),
+        "{Today}": day.strftime("%Y-%m-%d")
+    }
+
 def replace_system_variables(content):
     """Replace system variables with current values"""
     if not content:
         return content
-        
-    from datetime import datetime
-    now = datetime.now()
     
-    replacements = {
-        "{Current Date}": now.strftime("%Y-%m-%d"),
-        "{Current Year}": now.strftime("%Y"),
-        "{Current Month}": now.strftime("%B"),
-        "{Today}": now.strftime("%Y-%m-%d")
-    }
+    replacements = system_variable_values(datetime.now().date())
     
     for var, value in replacements.items():
         content = content.replace(var, value)
     
     return content
 
+def substitute_variables(content, values):
+    """Replace {Variable} placeholders in a single pass, leaving unknown ones intact"""
+    if not content:
+        return content
+    
+    def lookup(match):
+        name = match.group(1)
+        return str(values[name]) if name in values else match.group(0)
+    
+    return TEMPLATE_VARIABLE_PATTERN.sub(lookup, content)
+
+def render_template_preview(cache_key, content, values=None):
+    """Render a cleaned HTML preview, reusing the last result while its inputs are unchanged"""
+    values = values or {}
+    signature = (
+        content,
+        tuple((name, str(value)) for name, value in values.items()),
+        datetime.now().date(),
+    )
+    cached = st.session_state.get(cache_key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    
+    preview_content = substitute_variables(replace_system_variables(content), values)
+    clean_preview = clean_html_content(preview_content)
+    st.session_state[cache_key] = (signature, clean_preview)
+    return clean_preview
+
+def compile_template(content):
+    """Split content once into literal text (even indices) and variable names (odd indices)"""
+    return TEMPLATE_VARIABLE_PATTERN.split(content or "")
+
+def render_template(parts, values):
+    """Fill a compiled template; variables missing from values are left as {Name}"""
+    rendered = list(parts)
+    for i in range(1, len(rendered), 2):
+        name = rendered[i]
+        rendered[i] = str(values[name]) if name in values else f"{{{name}}}"
+    return "".join(rendered)
+
 def update_current_templates():
     """Update current templates with the latest content from editors"""
     # Get email template content from the separate session state key to avoid widget conflicts
@@ -2258,7 +2326,7 @@ def update_current_templates():
     if email_content is None:
         email_content = ''
     
-    if email_content and hasattr(st.session_state, 'email_settings'):
+    if email_content:
         email_settings = st.session_state.email_settings or {}
         st.session_state.current_email_template = {
             'content': email_content,
@@ -2279,7 +2347,7 @@ def update_current_templates():
             'template_path': 'NSNA Atlanta Letterhead Updated.pdf'
         }
 
-def send_email_debug_wrapper(from_email, to_email, subject, html_content, attachment_path, smtp_settings, is_test=False):
+def send_email_debug_wrapper(from_email, to_email, subject, html_content, attachment_path, smtp_settings, is_test=False, session=None):
     """Local debug wrapper for email sending - calls the actual mail sender function"""
     try:
         # Add basic debug info to the session debug log
@@ -2305,7 +2373,8 @@ def send_email_debug_wrapper(from_email, to_email, subject, html_content, attach
             html_content=html_content,
             attachment_path=attachment_path,
             smtp_settings=smtp_settings,
-            is_test=is_test
+            is_test=is_test,
+            session=session
         )
         
         return success
@@ -2317,17 +2386,8 @@ def send_email_debug_wrapper(from_email, to_email, subject, html_content, attach
 def get_letterhead_path():
     """Get the letterhead path for cloud deployment"""
     # For cloud deployment, check if letterhead exists in expected locations
-    possible_paths = [
-        'NSNA Atlanta Letterhead Updated.pdf',
-        'src/templates/letterhead_template.pdf',
-        'letterhead_template.pdf'
-    ]
-    
-    for path in possible_paths:
-        if os.path.exists(path):
-            return path
-    
-    return None
+    path = find_first_existing(CLOUD_LETTERHEAD_CANDIDATES)
+    return str(path) if path else None
 
 def load_saved_templates():
     """Load saved email and PDF templates"""
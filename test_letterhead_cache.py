@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Test that the letterhead preloaded by the mail merge is reused by the receipt renders
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to Python path
+src_path = Path(__file__).parent / 'src'
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+pytest.importorskip("fpdf")
+pytest.importorskip("PyPDF2")
+
+from utils import pdf_generator
+
+
+def test_preloaded_letterhead_is_a_cache_hit(tmp_path, monkeypatch):
+    letterhead = tmp_path / "letterhead.pdf"
+    letterhead.write_bytes(b"%PDF-1.4 letterhead")
+    monkeypatch.chdir(tmp_path)
+    pdf_generator._read_letterhead_cached.cache_clear()
+
+    # The app preloads the cwd-relative path; PDFGenerator asks for the absolute one
+    preloaded = pdf_generator.read_letterhead_bytes(Path("letterhead.pdf"))
+    rendered = pdf_generator.read_letterhead_bytes(letterhead.resolve())
+
+    info = pdf_generator._read_letterhead_cached.cache_info()
+    assert rendered is preloaded
+    assert (info.misses, info.hits) == (1, 1)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test that a rejected OAuth access token is refreshed in the stored token file too
+"""
+import json
+import smtplib
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add src directory to Python path
+src_path = Path(__file__).parent / 'src'
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+pytest.importorskip("google.oauth2.credentials")
+pytest.importorskip("google_auth_oauthlib")
+
+from google.oauth2.credentials import Credentials
+from utils import mail_sender, oauth_manager
+
+EMAIL = "sender@example.com"
+SMTP_SETTINGS = {
+    'smtp_server': 'smtp.example.com',
+    'smtp_port': 587,
+    'use_oauth': True,
+    'dynamic_user_oauth': True,
+    'client_id': 'client-id',
+    'client_secret': 'client-secret',
+}
+
+
+class RejectingSMTP:
+    """SMTP stand-in that refuses every XOAUTH2 login and records the tokens offered"""
+    offered = []
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def set_debuglevel(self, level):
+        pass
+
+    def starttls(self):
+        pass
+
+    def ehlo(self):
+        pass
+
+    def close(self):
+        pass
+
+    def docmd(self, cmd, args=""):
+        RejectingSMTP.offered.append(args)
+        return 535, b"5.7.8 Username and Password not accepted"
+
+
+def test_rejected_token_is_refreshed_on_disk(tmp_path, monkeypatch):
+    token_path = tmp_path / "token.json"
+    # Not expired yet, so loading the file alone would hand back the rejected token
+    token_path.write_text(json.dumps({
+        "token": "stale-token",
+        "refresh_token": "refresh-token",
+        "client_id": SMTP_SETTINGS['client_id'],
+        "client_secret": SMTP_SETTINGS['client_secret'],
+        "expiry": (datetime.utcnow() + timedelta(minutes=50)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }))
+
+    def refresh(self, request):
+        self.token = "fresh-token"
+        self.expiry = datetime.utcnow() + timedelta(hours=1)
+
+    monkeypatch.setattr(oauth_manager, "get_user_token_path", lambda email: token_path)
+    monkeypatch.setattr(oauth_manager, "_access_tokens", {})
+    monkeypatch.setattr(Credentials, "refresh", refresh)
+    monkeypatch.setattr(mail_sender.smtplib, "SMTP", RejectingSMTP)
+    RejectingSMTP.offered.clear()
+
+    with pytest.raises(smtplib.SMTPAuthenticationError):
+        mail_sender.open_smtp_connection(EMAIL, SMTP_SETTINGS)
+
+    assert len(RejectingSMTP.offered) == 1
+    assert json.loads(token_path.read_text())["token"] == "fresh-token"
+    assert mail_sender.get_oauth_access_token(
+        EMAIL,
+        SMTP_SETTINGS['client_id'],
+        SMTP_SETTINGS['client_secret'],
+        dynamic_user_oauth=True,
+    ) == "fresh-token"